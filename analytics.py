@@ -0,0 +1,169 @@
+import re
+import pandas as pd
+
+from classification import (
+    HUMIDITY_KEYWORDS, TEMP_KEYWORDS, WIND_KEYWORDS, category_counts, combined_advice,
+    interpret_combined, interpret_thi, interpret_wci, resolve_unique, sensor_type_mask
+)
+from profiling import stage
+
+# Pure analytics used by both the Streamlit viewer and the batch CLI.
+# Nothing here imports streamlit, so it can run in worker processes.
+SENSOR_COLUMNS = ['record_datetime', 'sensor_name', 'value_calibration', 'sensor_unit']
+THI_COLUMNS = ['record_datetime', 'location', 'sensor_name', 'value_calibration_temp', 'value_calibration_hum', 'THI', 'THI_Interpretasi']
+WCI_COLUMNS = ['record_datetime', 'location', 'sensor_name', 'value_calibration_temp', 'value_calibration_wind', 'WCI', 'WCI_Interpretasi']
+DEFAULT_TOLERANCE_SECONDS = 60
+
+# Sensor alignment: temp, humidity and wind readings come from differently named
+# sensors, so they are paired by location (house/kandang) and nearest timestamp.
+SENSOR_TYPE_PATTERN = re.compile(r'temperature|temp|humidity|hum|wind_?speed|wind')
+
+def sensor_location(name):
+    location = SENSOR_TYPE_PATTERN.sub('', str(name).lower())
+    location = re.sub(r'[_\-\s.]+', '_', location).strip('_')
+    return location or 'default'
+
+def read_location_map(source):
+    mapping = pd.read_csv(source, usecols=['sensor_name', 'location'], dtype=str)
+    return dict(zip(mapping['sensor_name'], mapping['location']))
+
+def assign_locations(sensor_names, location_map=None):
+    location_map = location_map or {}
+    locations = resolve_unique(sensor_names, lambda name: location_map.get(str(name), sensor_location(name)))
+    return pd.Series(locations, index=sensor_names.index)
+
+def _alignment_side(df, location_map):
+    side = df[SENSOR_COLUMNS].copy()
+    side['record_datetime'] = pd.to_datetime(side['record_datetime'], errors='coerce')
+    side = side.dropna(subset=['record_datetime'])
+    side['location'] = assign_locations(side['sensor_name'], location_map)
+    return side.sort_values('record_datetime', kind='stable')
+
+def align_readings(temp_df, humidity_df, wind_df, location_map=None, tolerance_seconds=DEFAULT_TOLERANCE_SECONDS):
+    # Every temperature reading is matched to the nearest humidity / wind reading
+    # of the same location within the tolerance; unmatched values stay NaN.
+    # merge_asof walks the sorted frames once, so the cost grows linearly with rows.
+    aligned = _alignment_side(temp_df, location_map).rename(columns={
+        'value_calibration': 'value_calibration_temp',
+        'sensor_unit': 'sensor_unit_temp'
+    })
+    tolerance = pd.Timedelta(seconds=tolerance_seconds)
+    for other, suffix in ((humidity_df, 'hum'), (wind_df, 'wind')):
+        if other.empty:
+            continue
+        side = _alignment_side(other, location_map).rename(columns={
+            'sensor_name': f'sensor_name_{suffix}',
+            'value_calibration': f'value_calibration_{suffix}',
+            'sensor_unit': f'sensor_unit_{suffix}'
+        })
+        aligned = pd.merge_asof(
+            aligned,
+            side,
+            on='record_datetime',
+            by='location',
+            tolerance=tolerance,
+            direction='nearest'
+        )
+    return aligned.reset_index(drop=True)
+
+def split_sensors(df, show_temp=True, show_humidity=True, show_wind=True):
+    temp_df = pd.DataFrame()
+    humidity_df = pd.DataFrame()
+    wind_df = pd.DataFrame()
+    if show_temp:
+        temp_df = df[sensor_type_mask(df['sensor_name'], TEMP_KEYWORDS)]
+        temp_df = temp_df.sort_values(['sensor_name', 'record_datetime'])
+    if show_humidity:
+        humidity_df = df[sensor_type_mask(df['sensor_name'], HUMIDITY_KEYWORDS)]
+        humidity_df = humidity_df.sort_values(['sensor_name', 'record_datetime'])
+    if show_wind:
+        wind_df = df[sensor_type_mask(df['sensor_name'], WIND_KEYWORDS)]
+    return temp_df, humidity_df, wind_df
+
+def compute_thi(aligned):
+    if aligned.empty or 'value_calibration_hum' not in aligned.columns:
+        return pd.DataFrame()
+    merged_thi = aligned.dropna(subset=['value_calibration_hum']).copy()
+    merged_thi['THI'] = merged_thi['value_calibration_temp'] - (
+        (0.55 - 0.0055 * merged_thi['value_calibration_hum']) * (merged_thi['value_calibration_temp'] - 14.5)
+    )
+    merged_thi['THI_Interpretasi'] = interpret_thi(merged_thi['THI'])
+    return merged_thi
+
+def compute_wci(aligned):
+    if aligned.empty or 'value_calibration_wind' not in aligned.columns:
+        return pd.DataFrame()
+    wind_merged = aligned.dropna(subset=['value_calibration_wind']).copy()
+    wind_merged['WCI'] = wind_merged['value_calibration_temp'] - (wind_merged['value_calibration_wind'] * 0.7)
+    wind_merged['WCI_Interpretasi'] = interpret_wci(wind_merged['WCI'])
+    return wind_merged
+
+def compute_combined(merged_thi, wind_merged):
+    if merged_thi.empty or wind_merged.empty:
+        return pd.DataFrame()
+    # Both frames are slices of the aligned table, so rows pair up by index
+    thi_df = merged_thi[THI_COLUMNS]
+    wci_df = wind_merged[['value_calibration_wind', 'WCI', 'WCI_Interpretasi']]
+    combined = thi_df.join(wci_df, how='inner')
+    combined['Interpretasi Gabungan'] = interpret_combined(combined['THI_Interpretasi'], combined['WCI_Interpretasi'])
+    combined['Saran Pencegahan'] = combined_advice(combined['Interpretasi Gabungan'])
+    return combined
+
+def analyze(df, show_temp=True, show_humidity=True, show_wind=True, location_map=None, tolerance_seconds=DEFAULT_TOLERANCE_SECONDS, profiler=None):
+    with stage(profiler, 'split_sensors', len(df)) as record:
+        temp_df, humidity_df, wind_df = split_sensors(df, show_temp, show_humidity, show_wind)
+        record['rows_out'] = len(temp_df) + len(humidity_df) + len(wind_df)
+    aligned = pd.DataFrame()
+    if not temp_df.empty and (not humidity_df.empty or not wind_df.empty):
+        with stage(profiler, 'align', len(temp_df) + len(humidity_df) + len(wind_df)) as record:
+            aligned = align_readings(temp_df, humidity_df, wind_df, location_map, tolerance_seconds)
+            record['rows_out'] = len(aligned)
+    with stage(profiler, 'thi', len(aligned)) as record:
+        merged_thi = compute_thi(aligned)
+        record['rows_out'] = len(merged_thi)
+    with stage(profiler, 'wci', len(aligned)) as record:
+        wind_merged = compute_wci(aligned)
+        record['rows_out'] = len(wind_merged)
+    with stage(profiler, 'combined', len(merged_thi) + len(wind_merged)) as record:
+        combined = compute_combined(merged_thi, wind_merged)
+        record['rows_out'] = len(combined)
+    return {
+        'temp': temp_df,
+        'humidity': humidity_df,
+        'wind': wind_df,
+        'thi': merged_thi,
+        'wci': wind_merged,
+        'combined': combined
+    }
+
+def summarize(result):
+    summary = {f'rows_{name}': len(frame) for name, frame in result.items()}
+    for name, column in (('thi', 'THI_Interpretasi'), ('wci', 'WCI_Interpretasi'), ('combined', 'Interpretasi Gabungan')):
+        frame = result[name]
+        counts = category_counts(frame[column]) if not frame.empty else pd.Series(dtype='int64')
+        summary[f'{name}_counts'] = {str(label): int(count) for label, count in counts.items()}
+    return summary
+
+def thi_conclusion(summary):
+    total = summary.sum()
+    kesimpulan = ''
+    if summary.get('Stress Berat', 0) > 0:
+        kesimpulan += f"Terdapat {summary.get('Stress Berat', 0)} data (" + f"{summary.get('Stress Berat', 0)/total*100:.1f}%" + ") ayam dalam kondisi STRESS BERAT. Segera lakukan tindakan perbaikan lingkungan!\n"
+    if summary.get('Stress Sedang', 0) > 0:
+        kesimpulan += f"Terdapat {summary.get('Stress Sedang', 0)} data (" + f"{summary.get('Stress Sedang', 0)/total*100:.1f}%" + ") ayam dalam kondisi STRESS SEDANG. Perlu peningkatan ventilasi dan pengelolaan suhu!\n"
+    if summary.get('Waspada (Stress Ringan)', 0) > 0:
+        kesimpulan += f"Terdapat {summary.get('Waspada (Stress Ringan)', 0)} data (" + f"{summary.get('Waspada (Stress Ringan)', 0)/total*100:.1f}%" + ") ayam dalam kondisi WASPADA (STRESS RINGAN). Monitor kondisi kandang secara berkala.\n"
+    if summary.get('Aman (Normal)', 0) > 0:
+        kesimpulan += f"Sebagian besar data ({summary.get('Aman (Normal)', 0)}/{total}) ayam dalam kondisi AMAN (NORMAL)."
+    return kesimpulan
+
+def wci_conclusion(wci_summary):
+    wci_total = wci_summary.sum()
+    wci_kesimpulan = ''
+    if wci_summary.get('Risiko Kedinginan (Wind Chill Tinggi)', 0) > 0:
+        wci_kesimpulan += f"Terdapat {wci_summary.get('Risiko Kedinginan (Wind Chill Tinggi)', 0)} data (" + f"{wci_summary.get('Risiko Kedinginan (Wind Chill Tinggi)', 0)/wci_total*100:.1f}%" + ") ayam berisiko kedinginan akibat efek angin tinggi.\n"
+    if wci_summary.get('Cukup Dingin (Perlu Waspada)', 0) > 0:
+        wci_kesimpulan += f"Terdapat {wci_summary.get('Cukup Dingin (Perlu Waspada)', 0)} data (" + f"{wci_summary.get('Cukup Dingin (Perlu Waspada)', 0)/wci_total*100:.1f}%" + ") ayam dalam kondisi cukup dingin, perlu waspada.\n"
+    if wci_summary.get('Aman (Normal)', 0) > 0:
+        wci_kesimpulan += f"Sebagian besar data ({wci_summary.get('Aman (Normal)', 0)}/{wci_total}) ayam dalam kondisi aman dari wind chill."
+    return wci_kesimpulan
@@ -0,0 +1,135 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from analytics import DEFAULT_TOLERANCE_SECONDS, analyze, read_location_map, summarize
+from ingest import SUPPORTED_TYPES, file_extension, read_sensor_file
+
+# Headless processing of IoT exports: every input file gets its own output
+# folder with THI, wind chill and combined tables plus summary.json, and the
+# run writes batch_summary.csv with one row per file.
+OUTPUT_TABLES = ['thi', 'wci', 'combined']
+
+def collect_inputs(patterns):
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = [os.path.join(pattern, name) for name in sorted(os.listdir(pattern))]
+        else:
+            candidates = sorted(glob.glob(pattern))
+        paths.extend(os.path.abspath(path) for path in candidates if os.path.isfile(path) and file_extension(path) in SUPPORTED_TYPES)
+    # Keep the first occurrence when patterns overlap
+    paths = list(dict.fromkeys(paths))
+    return list(zip(paths, output_names(paths)))
+
+def output_names(paths):
+    # Output folders mirror each input's path below the inputs' common directory
+    # ('farmA/house1.csv' -> 'farmA__house1.csv'), so equal export names from
+    # different farms, or .csv/.parquet twins, never share a folder
+    if not paths:
+        return []
+    root = os.path.commonpath([os.path.dirname(path) for path in paths])
+    names = [os.path.relpath(path, root).replace(os.sep, '__') for path in paths]
+    collisions = sorted(name for name, count in Counter(names).items() if count > 1)
+    if collisions:
+        raise ValueError(f"Inputs map to the same output folder: {', '.join(collisions)}")
+    return names
+
+def write_table(df, path_stem, output_format):
+    if output_format == 'parquet':
+        df.to_parquet(f'{path_stem}.parquet', index=False)
+    else:
+        df.to_csv(f'{path_stem}.csv', index=False)
+
+def process_file(path, output_name, output_dir, location_map=None, tolerance_seconds=DEFAULT_TOLERANCE_SECONDS, output_format='csv'):
+    start = time.perf_counter()
+    df = read_sensor_file(path, os.path.basename(path))
+    result = analyze(df, location_map=location_map, tolerance_seconds=tolerance_seconds)
+    file_dir = os.path.join(output_dir, output_name)
+    os.makedirs(file_dir, exist_ok=True)
+    for name in OUTPUT_TABLES:
+        if not result[name].empty:
+            write_table(result[name], os.path.join(file_dir, name), output_format)
+    summary = {'file': path, 'output': output_name, 'rows_input': len(df)}
+    summary.update(summarize(result))
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    with open(os.path.join(file_dir, 'summary.json'), 'w', encoding='utf-8') as handle:
+        json.dump(summary, handle, ensure_ascii=False, indent=2)
+    return summary
+
+def flatten_summary(summary):
+    row = {}
+    for key, value in summary.items():
+        if isinstance(value, dict):
+            for label, count in value.items():
+                row[f'{key}:{label}'] = count
+        else:
+            row[key] = value
+    return row
+
+def summary_table(summaries):
+    table = pd.DataFrame([flatten_summary(summary) for summary in summaries]).sort_values('file')
+    # A category missing from a file counted zero rows; failed files have no
+    # counts at all. Int64 keeps the counts integers next to those blanks.
+    processed = table['error'].isna() if 'error' in table.columns else pd.Series(True, index=table.index)
+    for column in table.columns:
+        if '_counts:' in column:
+            table.loc[processed, column] = table.loc[processed, column].fillna(0)
+        if column.startswith('rows_') or '_counts:' in column:
+            table[column] = table[column].astype('Int64')
+    return table
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Compute THI, wind chill and combined risk for IoT sensor exports without the Streamlit viewer.')
+    parser.add_argument('inputs', nargs='+', help='Files, directories or glob patterns (CSV/XLSX/Parquet/Feather)')
+    parser.add_argument('-o', '--output-dir', default='output', help='Directory for results (default: output)')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help='Worker processes (default: CPU count)')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE_SECONDS, help='Alignment time tolerance in seconds')
+    parser.add_argument('--location-map', help='CSV with sensor_name, location columns')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help='Output table format')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        inputs = collect_inputs(args.inputs)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    if not inputs:
+        print('No input files found.', file=sys.stderr)
+        return 1
+    location_map = read_location_map(args.location_map) if args.location_map else None
+    os.makedirs(args.output_dir, exist_ok=True)
+    summaries = []
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(inputs)))) as executor:
+        futures = {
+            executor.submit(process_file, path, output_name, args.output_dir, location_map, args.tolerance, args.format): path
+            for path, output_name in inputs
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                failed += 1
+                print(f'FAILED {path}: {e}', file=sys.stderr)
+                summaries.append({'file': path, 'error': str(e)})
+                continue
+            print(f"{path}: {summary['rows_input']:,} rows in {summary['seconds']:.2f} s")
+            summaries.append(summary)
+    batch_summary = summary_table(summaries)
+    batch_summary.to_csv(os.path.join(args.output_dir, 'batch_summary.csv'), index=False)
+    print(f'Processed {len(inputs) - failed}/{len(inputs)} files into {args.output_dir}')
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
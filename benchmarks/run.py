@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from analytics import align_readings, compute_combined, compute_thi, compute_wci, split_sensors
+from benchmarks.synthetic import generate_readings, write_dataset
+from exports import csv_bytes, xlsx_bytes
+from ingest import read_sensor_file
+from profiling import rss_mb
+from rollup import build_rollups
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Times every pipeline stage on synthetic data of increasing size and writes
+# the results as JSON, so runs from different commits can be compared with
+# --compare. Wall time comes from an uninstrumented run. Memory is measured
+# separately: each stage runs again in a fresh subprocess on its pickled
+# inputs, and the peak RSS there (Arrow/Parquet buffers included) is reported
+# both absolute and as growth above the loaded inputs. On Linux the peak is
+# read from VmHWM and restarted once the inputs are loaded.
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+XLSX_MAX_ROWS = 1_000_000
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_input(path):
+    return read_sensor_file(path, os.path.basename(path))
+
+def align_parts(parts):
+    return align_readings(*parts)
+
+# (stage, input names, function, output name); inputs are outputs of earlier stages
+STAGES = [
+    ('load', ['path'], load_input, 'df'),
+    ('split_sensors', ['df'], split_sensors, 'parts'),
+    ('align', ['parts'], align_parts, 'aligned'),
+    ('thi', ['aligned'], compute_thi, 'thi'),
+    ('wci', ['aligned'], compute_wci, 'wci'),
+    ('combined', ['thi', 'wci'], compute_combined, 'combined'),
+    ('rollup', ['thi', 'wci'], build_rollups, 'rollups'),
+    ('export_csv', ['combined'], csv_bytes, None),
+    ('export_xlsx', ['combined'], xlsx_bytes, None)
+]
+STAGE_FUNCTIONS = {name: func for name, _, func, _ in STAGES}
+
+def output_rows(output):
+    if isinstance(output, pd.DataFrame):
+        return len(output)
+    if isinstance(output, dict):
+        return sum(len(frame) for frame in output.values())
+    if isinstance(output, tuple):
+        return sum(len(frame) for frame in output)
+    # Encoded exports (bytes) have no row count
+    return None
+
+def peak_rss_mb():
+    # VmHWM starts over at exec; ru_maxrss on Linux carries the parent's
+    # high-water mark into the child and would report the harness itself
+    try:
+        with open('/proc/self/status', encoding='ascii') as handle:
+            for line in handle:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 2 ** 10
+    except OSError:
+        pass
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return usage / 2 ** 20 if sys.platform == 'darwin' else usage / 2 ** 10
+
+def reset_peak_rss():
+    # Linux only: restart VmHWM at the current RSS so the peak covers the
+    # stage and not unpickling its inputs
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as handle:
+            handle.write('5')
+    except OSError:
+        pass
+
+def stage_worker(stage, args_path):
+    with open(args_path, 'rb') as handle:
+        args = pickle.load(handle)
+    reset_peak_rss()
+    baseline = rss_mb()
+    STAGE_FUNCTIONS[stage](*args)
+    peak = peak_rss_mb()
+    stage_peak = None if baseline is None else round(max(0.0, peak - baseline), 2)
+    print(json.dumps({'peak_rss_mb': round(peak, 2), 'stage_rss_mb': stage_peak}))
+
+def stage_memory(stage, args, workdir):
+    args_path = os.path.join(workdir, f'{stage}.pkl')
+    with open(args_path, 'wb') as handle:
+        pickle.dump(args, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    try:
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.run', '--stage-worker', stage, args_path],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    finally:
+        os.remove(args_path)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def run_size(size, workdir, input_format, xlsx_max_rows, measure_memory, results):
+    raw = generate_readings(size, n_locations=max(4, size // 250_000))
+    path = os.path.join(workdir, f'bench_{size}.{input_format}')
+    write_dataset(raw, path)
+    del raw
+    values = {'path': path}
+    for stage, inputs, func, output in STAGES:
+        args = [values[name] for name in inputs]
+        if stage == 'export_xlsx' and len(values['combined']) > xlsx_max_rows:
+            continue
+        rows_in = size if stage == 'load' else sum(output_rows(arg) or 0 for arg in args)
+        start = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - start
+        row = {
+            'size': size,
+            'stage': stage,
+            'seconds': round(seconds, 4),
+            'rows_in': rows_in,
+            'rows_out': output_rows(result),
+            'peak_rss_mb': None,
+            'stage_rss_mb': None
+        }
+        if measure_memory:
+            row.update(stage_memory(stage, args, workdir))
+        results.append(row)
+        memory = f"{row['stage_rss_mb']:>10.1f} MB" if row['stage_rss_mb'] is not None else f"{'-':>13}"
+        rows_out = row['rows_out'] if row['rows_out'] is not None else '-'
+        print(f'{size:>12,} {stage:<18} {seconds:>9.3f} s {memory}  rows {rows_in:,} -> {rows_out}')
+        if output is not None:
+            values[output] = result
+        del result
+    os.remove(path)
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _change(before, after, unit, digits):
+    if before is None or after is None:
+        return f"{'-':>{digits + 14}}"
+    ratio = f'({after / before:.2f}x)' if before else ''
+    return f'{before:>9.{digits}f} {unit} -> {after:>9.{digits}f} {unit} {ratio:<8}'
+
+def compare(current, baseline_path):
+    with open(baseline_path, encoding='utf-8') as handle:
+        baseline = json.load(handle)
+    previous = {(row['size'], row['stage']): row for row in baseline['results']}
+    print(f"\nCompared with {baseline.get('commit') or baseline_path}:")
+    for row in current['results']:
+        before = previous.get((row['size'], row['stage']))
+        if before is None:
+            continue
+        seconds = _change(before['seconds'], row['seconds'], 's', 3)
+        peak = _change(before.get('peak_rss_mb'), row.get('peak_rss_mb'), 'MB', 1)
+        stage_peak = _change(before.get('stage_rss_mb'), row.get('stage_rss_mb'), 'MB', 1)
+        print(f"{row['size']:>12,} {row['stage']:<18} {seconds}  peak {peak}  stage {stage_peak}".rstrip())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the IoT analysis pipeline on synthetic data.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Row counts to benchmark')
+    parser.add_argument('--input-format', choices=['csv', 'parquet', 'feather'], default='csv')
+    parser.add_argument('--xlsx-max-rows', type=int, default=XLSX_MAX_ROWS, help='Skip the XLSX export above this many rows')
+    parser.add_argument('-o', '--output', default='bench_results.json', help='JSON results file')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the per-stage memory subprocesses')
+    parser.add_argument('--stage-worker', nargs=2, metavar=('STAGE', 'ARGS_PICKLE'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.stage_worker:
+        stage_worker(*args.stage_worker)
+        return 0
+    measure_memory = not args.no_memory and resource is not None
+    if not args.no_memory and resource is None:
+        print('Memory measurement needs the resource module (Unix); timing only.', file=sys.stderr)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            run_size(size, workdir, args.input_format, args.xlsx_max_rows, measure_memory, results)
+    report = {
+        'commit': git_commit(),
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'input_format': args.input_format,
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+    print(f'Results written to {args.output}')
+    if args.compare:
+        compare(report, args.compare)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import argparse
+import math
+
+import numpy as np
+import pandas as pd
+
+# Synthetic IoT exports in the viewer's input format. Every location has one
+# temperature, humidity and wind sensor reporting at a fixed interval with
+# clock jitter, so alignment has to tolerate timestamps that never match exactly.
+SENSOR_TYPES = {
+    'temp': '°C',
+    'hum': '%',
+    'wind': 'm/s'
+}
+
+def generate_readings(n_rows, n_locations=4, sensor_types=tuple(SENSOR_TYPES), interval_seconds=60,
+                      jitter_seconds=2.0, drop_rate=0.0, start='2025-06-09', seed=0):
+    rng = np.random.default_rng(seed)
+    n_sensors = n_locations * len(sensor_types)
+    n_ticks = max(1, math.ceil(n_rows / n_sensors))
+    ticks = np.arange(n_ticks, dtype='float64') * interval_seconds
+    # Daily cycle shared by all locations: hottest mid-afternoon
+    phase = np.sin(2 * np.pi * (ticks / 86400 - 0.375))
+    frames = []
+    for location in range(1, n_locations + 1):
+        offset = rng.normal(0, 0.8)
+        for sensor_type in sensor_types:
+            if sensor_type == 'temp':
+                values = 29 + offset + 4 * phase + rng.normal(0, 0.5, n_ticks)
+            elif sensor_type == 'hum':
+                values = 75 - 12 * phase + rng.normal(0, 2, n_ticks)
+            else:
+                values = np.abs(2 + 1.5 * phase + rng.normal(0, 1, n_ticks))
+            jitter = rng.uniform(-jitter_seconds, jitter_seconds, n_ticks)
+            frames.append(pd.DataFrame({
+                'record_datetime': pd.Timestamp(start) + pd.to_timedelta(ticks + jitter, unit='s'),
+                'sensor_name': f'{sensor_type}_sensor{location}',
+                'value_calibration': values.round(2),
+                'sensor_unit': SENSOR_TYPES[sensor_type]
+            }))
+    df = pd.concat(frames, ignore_index=True).sort_values('record_datetime', kind='stable')
+    if drop_rate > 0:
+        df = df[rng.random(len(df)) >= drop_rate]
+    df = df.head(n_rows).reset_index(drop=True)
+    df['record_datetime'] = df['record_datetime'].dt.floor('s')
+    return df
+
+def write_dataset(df, path):
+    if path.endswith('.parquet'):
+        df.to_parquet(path, index=False)
+    elif path.endswith('.feather'):
+        df.to_feather(path)
+    elif path.endswith('.xlsx'):
+        df.to_excel(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate synthetic IoT sensor data.')
+    parser.add_argument('output', help='Output file (.csv, .parquet, .feather or .xlsx)')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--locations', type=int, default=4)
+    parser.add_argument('--interval', type=float, default=60, help='Seconds between readings of one sensor')
+    parser.add_argument('--jitter', type=float, default=2.0, help='Maximum clock jitter in seconds')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='Fraction of readings to drop')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    df = generate_readings(args.rows, args.locations, interval_seconds=args.interval,
+                           jitter_seconds=args.jitter, drop_rate=args.drop_rate, seed=args.seed)
+    write_dataset(df, args.output)
+    print(f'Wrote {len(df):,} rows to {args.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+# Disk-backed cache for parsed uploads and analysis results, shared by every
+# Streamlit worker on the machine. Entries are keyed by the file content hash
+# plus the analysis parameters and stored as one Parquet file per frame.
+CACHE_DIR = os.environ.get('IOTDATA_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'iotdata'))
+CACHE_MAX_MB = int(os.environ.get('IOTDATA_CACHE_MAX_MB', '2048'))
+MANIFEST_NAME = 'manifest.json'
+STATS_NAME = 'stats.json'
+# Part of every key. Bump it whenever ingest or analysis output changes, so
+# entries written by older code are no longer served (they age out by LRU).
+CACHE_VERSION = 2
+
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+def cache_key(file_hash, stage, **params):
+    payload = json.dumps({'version': CACHE_VERSION, 'file': file_hash, 'stage': stage, 'params': params}, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+def _entry_dir(key, cache_dir):
+    return os.path.join(cache_dir, key)
+
+def _record(event, cache_dir, count=1):
+    # Best-effort counters; concurrent workers may occasionally lose an update
+    path = os.path.join(cache_dir, STATS_NAME)
+    try:
+        with open(path, encoding='utf-8') as handle:
+            stats = json.load(handle)
+    except (OSError, ValueError):
+        stats = {}
+    stats[event] = stats.get(event, 0) + count
+    try:
+        # The first lookups are misses that happen before anything is stored
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(stats, handle)
+    except OSError:
+        pass
+
+def load_frames(key, cache_dir=CACHE_DIR):
+    entry = _entry_dir(key, cache_dir)
+    try:
+        with open(os.path.join(entry, MANIFEST_NAME), encoding='utf-8') as handle:
+            manifest = json.load(handle)
+        frames = {}
+        for name, stored in manifest['frames'].items():
+            frames[name] = pd.read_parquet(os.path.join(entry, f'{name}.parquet')) if stored else pd.DataFrame()
+    except (OSError, ValueError, KeyError):
+        _record('misses', cache_dir)
+        return None
+    # The entry's mtime is its last use, which drives LRU eviction. Another
+    # worker may have evicted it since the read; the frames are loaded already
+    try:
+        os.utime(entry)
+    except OSError:
+        pass
+    _record('hits', cache_dir)
+    return frames
+
+def store_frames(key, frames, cache_dir=CACHE_DIR, max_mb=CACHE_MAX_MB):
+    os.makedirs(cache_dir, exist_ok=True)
+    entry = _entry_dir(key, cache_dir)
+    if os.path.isdir(entry):
+        return
+    # Written to a temporary directory first and renamed into place, so other
+    # workers never see a half-written entry
+    staging = tempfile.mkdtemp(prefix='.tmp-', dir=cache_dir)
+    try:
+        manifest = {'created': time.time(), 'frames': {}}
+        for name, frame in frames.items():
+            stored = not frame.empty
+            if stored:
+                frame.to_parquet(os.path.join(staging, f'{name}.parquet'), index=False)
+            manifest['frames'][name] = stored
+        with open(os.path.join(staging, MANIFEST_NAME), 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle)
+        os.replace(staging, entry)
+    except OSError:
+        # Another worker stored the same entry first
+        shutil.rmtree(staging, ignore_errors=True)
+        return
+    evict(max_mb, cache_dir)
+
+def _entries(cache_dir):
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.startswith('.') or not os.path.isdir(path):
+            continue
+        try:
+            size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+            entries.append((os.path.getmtime(path), size, path))
+        except OSError:
+            # Removed by another worker while scanning
+            continue
+    return entries
+
+def evict(max_mb=CACHE_MAX_MB, cache_dir=CACHE_DIR):
+    if not os.path.isdir(cache_dir):
+        return 0
+    entries = sorted(_entries(cache_dir))
+    total = sum(size for _, size, _ in entries)
+    limit = max_mb * 2 ** 20
+    evicted = 0
+    for _, size, path in entries:
+        if total <= limit:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        evicted += 1
+    if evicted:
+        _record('evictions', cache_dir, evicted)
+    return evicted
+
+def cache_stats(cache_dir=CACHE_DIR):
+    stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'entries': 0, 'size_mb': 0.0}
+    if not os.path.isdir(cache_dir):
+        return stats
+    try:
+        with open(os.path.join(cache_dir, STATS_NAME), encoding='utf-8') as handle:
+            stats.update(json.load(handle))
+    except (OSError, ValueError):
+        pass
+    entries = _entries(cache_dir)
+    stats['entries'] = len(entries)
+    stats['size_mb'] = sum(size for _, size, _ in entries) / 2 ** 20
+    return stats
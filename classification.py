@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+# Sensor type keywords, matched case-insensitively against sensor_name
+TEMP_KEYWORDS = ['temp', 'temperature']
+HUMIDITY_KEYWORDS = ['humidity', 'hum']
+WIND_KEYWORDS = ['wind']
+
+# Labels are ordered by their bin: a value below the first threshold gets the
+# first label, and so on. NaN falls into the last bin, as the original
+# if/elif chains did.
+THI_THRESHOLDS = [27, 28, 30]
+THI_LABELS = ['Aman (Normal)', 'Waspada (Stress Ringan)', 'Stress Sedang', 'Stress Berat']
+WCI_THRESHOLDS = [24, 27]
+WCI_LABELS = ['Risiko Kedinginan (Wind Chill Tinggi)', 'Cukup Dingin (Perlu Waspada)', 'Aman (Normal)']
+COMBINED_LABELS = [
+    'Aman',
+    'Waspada: Monitor dan lakukan pencegahan.',
+    'Risiko Tinggi: Segera lakukan perbaikan lingkungan!'
+]
+COMBINED_ADVICE = [
+    'Pertahankan kondisi kandang saat ini.',
+    'Pantau suhu, kelembaban, dan angin secara berkala, lakukan tindakan preventif.',
+    'Perbaiki ventilasi, tambahkan pendingin/pemanas, kurangi kepadatan, dan lindungi dari angin.'
+]
+
+def resolve_unique(values, func):
+    # func runs once per distinct value; the results are broadcast back through
+    # the factorized codes. The missing-value result sits last so code -1 hits it.
+    codes, uniques = pd.factorize(values)
+    resolved = [func(value) for value in uniques] + [func(np.nan)]
+    return np.asarray(resolved, dtype=object)[codes]
+
+def sensor_type(name, keywords):
+    return any(kw.lower() in str(name).lower() for kw in keywords)
+
+def sensor_type_mask(sensor_names, keywords):
+    return resolve_unique(sensor_names, lambda name: sensor_type(name, keywords)).astype(bool)
+
+def _binned(values, thresholds, labels):
+    codes = np.searchsorted(thresholds, np.asarray(values, dtype='float64'), side='right')
+    return pd.Categorical.from_codes(codes, categories=labels)
+
+def interpret_thi(thi):
+    return _binned(thi, THI_THRESHOLDS, THI_LABELS)
+
+def interpret_wci(wci):
+    return _binned(wci, WCI_THRESHOLDS, WCI_LABELS)
+
+def _codes(labels, categories):
+    # Distinct labels are looked up once; unknown labels get -1, and so do
+    # missing ones through the trailing entry that code -1 hits
+    labels = pd.Categorical(labels)
+    lookup = np.append(pd.Index(categories).get_indexer(labels.categories), -1)
+    return lookup[labels.codes]
+
+def interpret_combined(thi_labels, wci_labels):
+    thi_codes = _codes(thi_labels, THI_LABELS)
+    wci_codes = _codes(wci_labels, WCI_LABELS)
+    high = (thi_codes >= 2) | (wci_codes == 0)
+    alert = (thi_codes == 1) | (wci_codes == 1)
+    codes = np.where(high, 2, np.where(alert, 1, 0))
+    return pd.Categorical.from_codes(codes, categories=COMBINED_LABELS)
+
+def combined_advice(combined_labels):
+    codes = _codes(combined_labels, COMBINED_LABELS)
+    # Anything that is not a known risk label gets the "Aman" advice
+    codes = np.where(codes < 0, 0, codes)
+    return pd.Categorical.from_codes(codes, categories=COMBINED_ADVICE)
+
+def category_counts(labels):
+    # value_counts on a categorical also lists empty categories; drop them so
+    # summaries and pie charts only show categories that occur
+    counts = pd.Series(labels).value_counts()
+    return counts[counts > 0]
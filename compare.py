@@ -0,0 +1,115 @@
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from analytics import DEFAULT_TOLERANCE_SECONDS, analyze
+from classification import COMBINED_LABELS, THI_LABELS, WCI_LABELS
+from ingest import SUPPORTED_TYPES, file_extension, read_sensor_file
+
+# Side-by-side comparison of many exports (houses/farms). Each source is parsed
+# and analysed in its own worker and only small summaries travel back, so the
+# total time is close to that of the slowest file.
+KINDS = {
+    'thi': ('THI_Interpretasi', THI_LABELS),
+    'wci': ('WCI_Interpretasi', WCI_LABELS),
+    'combined': ('Interpretasi Gabungan', COMBINED_LABELS)
+}
+
+def source_name(file_name):
+    return os.path.splitext(os.path.basename(file_name))[0]
+
+def unique_labels(file_names, taken=()):
+    # Sources are labelled by file stem; repeated stems (the same export name
+    # from different farms, or house1.csv next to house1.parquet) get a
+    # " (2)", " (3)", ... suffix so they stay separate rows
+    used = set(taken)
+    labels = []
+    for file_name in file_names:
+        label = source_name(file_name)
+        suffix = 2
+        while label in used:
+            label = f'{source_name(file_name)} ({suffix})'
+            suffix += 1
+        used.add(label)
+        labels.append(label)
+    return labels
+
+def summarize_source(source, file_name, name, location_map=None, tolerance_seconds=DEFAULT_TOLERANCE_SECONDS):
+    start = time.perf_counter()
+    df = read_sensor_file(source, file_name)
+    result = analyze(df, location_map=location_map, tolerance_seconds=tolerance_seconds)
+    summary = {'source': name, 'rows': len(df), 'counts': {}, 'by_location': {}}
+    for kind, (column, labels) in KINDS.items():
+        frame = result[kind]
+        if frame.empty:
+            continue
+        # Rows are tagged with their source so per-location tables stay
+        # distinguishable once sources are put side by side
+        tagged = frame[['location', column]].assign(source=name)
+        summary['counts'][kind] = tagged[column].value_counts().reindex(labels, fill_value=0)
+        summary['by_location'][kind] = (
+            tagged.groupby(['source', 'location', column], observed=False).size().unstack(column, fill_value=0).reindex(columns=labels, fill_value=0)
+        )
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+def _collect(futures):
+    # One unreadable file must not abort the comparison: its error is returned
+    # next to the summaries of the files that did work
+    summaries = []
+    failures = []
+    for label, future in futures:
+        try:
+            summaries.append(future.result())
+        except Exception as e:
+            failures.append((label, str(e)))
+    return summaries, failures
+
+def summarize_uploads(files, location_map=None, tolerance_seconds=DEFAULT_TOLERANCE_SECONDS, max_workers=None, taken=()):
+    # files: (name, bytes) pairs. Threads share the upload buffers without
+    # copying them into worker processes; parsing releases the GIL for most
+    # of its time.
+    labels = unique_labels([name for name, _ in files], taken)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            (label, executor.submit(summarize_source, io.BytesIO(data), name, label, location_map, tolerance_seconds))
+            for label, (name, data) in zip(labels, files)
+        ]
+        return _collect(futures)
+
+def summarize_paths(paths, location_map=None, tolerance_seconds=DEFAULT_TOLERANCE_SECONDS, max_workers=None, taken=()):
+    # Files on disk are read inside worker processes, nothing large is pickled
+    labels = unique_labels(paths, taken)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            (label, executor.submit(summarize_source, path, os.path.basename(path), label, location_map, tolerance_seconds))
+            for label, path in zip(labels, paths)
+        ]
+        return _collect(futures)
+
+def folder_files(directory):
+    if not os.path.isdir(directory):
+        return []
+    return [
+        os.path.join(directory, name)
+        for name in sorted(os.listdir(directory))
+        if file_extension(name) in SUPPORTED_TYPES and os.path.isfile(os.path.join(directory, name))
+    ]
+
+def proportion_table(summaries, kind):
+    # Percentage of readings per category, one row per source
+    rows = {summary['source']: summary['counts'][kind] for summary in summaries if kind in summary['counts']}
+    if not rows:
+        return pd.DataFrame()
+    counts = pd.DataFrame(rows).T
+    return counts.div(counts.sum(axis=1), axis=0) * 100
+
+def location_table(summaries, kind):
+    frames = [summary['by_location'][kind] for summary in summaries if kind in summary['by_location']]
+    if not frames:
+        return pd.DataFrame()
+    counts = pd.concat(frames)
+    return counts.div(counts.sum(axis=1), axis=0) * 100
@@ -1,130 +1,437 @@
 import streamlit as st
 import pandas as pd
-import io
+import os
+import time
+from datetime import timedelta
 import matplotlib.pyplot as plt
 import plotly.graph_objs as go
 
-# Caching file reading for faster reloads
+from analytics import THI_COLUMNS, WCI_COLUMNS, analyze, read_location_map, thi_conclusion, wci_conclusion
+from cache import cache_key, cache_stats, content_hash, load_frames, store_frames
+from classification import category_counts
+from compare import folder_files, location_table, proportion_table, summarize_paths, summarize_uploads
+from downsample import DEFAULT_MAX_POINTS, downsample_frame
+from exports import EXPORT_FORMATS, build_export
+from ingest import SUPPORTED_TYPES, memory_mb, timed_read
+from live import LiveFeed
+from paging import PAGE_SIZES, filter_positions, page_count, page_frame, sort_positions
+from profiling import StageProfiler, new_session_id
+from rollup import DEFAULT_MAX_BUCKETS, build_rollups, query_rollup, summarize_rollup
+
+# Pie/bar chart colours per interpretation label
+THI_COLORS = {
+    'Aman (Normal)': '#4CAF50',
+    'Waspada (Stress Ringan)': '#FFEB3B',
+    'Stress Sedang': '#FF9800',
+    'Stress Berat': '#F44336'
+}
+WCI_COLORS = {
+    'Aman (Normal)': '#4CAF50',
+    'Cukup Dingin (Perlu Waspada)': '#2196F3',
+    'Risiko Kedinginan (Wind Chill Tinggi)': '#9C27B0'
+}
+COMBINED_COLORS = {
+    'Aman': '#4CAF50',
+    'Waspada: Monitor dan lakukan pencegahan.': '#FFEB3B',
+    'Risiko Tinggi: Segera lakukan perbaikan lingkungan!': '#F44336'
+}
+
+# Caching file reading for faster reloads: in memory per worker, and on disk
+# keyed by content hash so restarts and other workers reuse the parsed frame
 @st.cache_data(show_spinner=False)
 def load_file(uploaded_file):
-    if uploaded_file.name.endswith('.csv'):
-        return pd.read_csv(uploaded_file)
-    else:
-        return pd.read_excel(uploaded_file)
+    file_hash = content_hash(uploaded_file.getvalue())
+    key = cache_key(file_hash, 'parsed')
+    start = time.perf_counter()
+    cached = load_frames(key)
+    if cached is not None:
+        return cached['data'], time.perf_counter() - start, file_hash, True
+    df, load_seconds = timed_read(uploaded_file, uploaded_file.name)
+    store_frames(key, {'data': df})
+    return df, load_seconds, file_hash, False
 
-# Caching Excel/CSV generation for download
+# _df is not hashed by Streamlit; file_hash identifies the data instead
 @st.cache_data(show_spinner=False)
-def to_csv_bytes(df):
-    return df.to_csv(index=False).encode('utf-8')
+def run_analysis(file_hash, _df, show_temp, show_humidity, show_wind, location_map, tolerance_seconds, _profiler=None):
+    key = cache_key(
+        file_hash,
+        'analysis',
+        show_temp=show_temp,
+        show_humidity=show_humidity,
+        show_wind=show_wind,
+        location_map=location_map,
+        tolerance_seconds=tolerance_seconds
+    )
+    result = load_frames(key)
+    if result is None:
+        result = analyze(
+            _df,
+            show_temp=show_temp,
+            show_humidity=show_humidity,
+            show_wind=show_wind,
+            location_map=location_map,
+            tolerance_seconds=tolerance_seconds,
+            profiler=_profiler
+        )
+        store_frames(key, result)
+    return result
+
+# Filtered/sorted row positions are kept in the session, one entry per table,
+# so paging does not filter and sort again. Other sessions never see them and
+# the oldest tables are dropped once the session holds more than this
+TABLE_POSITIONS_MAX_BYTES = 64 * 2 ** 20
+
+def table_positions(token, name, df, sensors, start, end, filter_column, filter_text, sort_column, ascending):
+    settings = (token, sensors, start, end, filter_column, filter_text, sort_column, ascending)
+    cached = st.session_state.setdefault('table_positions', {})
+    entry = cached.pop(name, None)
+    if entry is not None and entry[0] == settings:
+        cached[name] = entry
+        return entry[1]
+    positions = filter_positions(df, list(sensors), start, end, filter_column, filter_text)
+    positions = sort_positions(df, positions, sort_column, ascending)
+    if len(df) < 2 ** 31:
+        positions = positions.astype('int32')
+    while cached and sum(kept.nbytes for _, kept in cached.values()) + positions.nbytes > TABLE_POSITIONS_MAX_BYTES:
+        cached.pop(next(iter(cached)))
+    if positions.nbytes <= TABLE_POSITIONS_MAX_BYTES:
+        cached[name] = (settings, positions)
+    return positions
 
+def paged_table(df, name, token, time_range, columns=None):
+    # Sorting and filters run on the server; only the current page is sent
+    columns = list(df.columns) if columns is None else columns
+    sort_col, order_col, filter_col, value_col = st.columns(4)
+    sort_column = sort_col.selectbox('Sort by', [None] + columns, format_func=lambda column: column or '(none)', key=f'{name}_sort')
+    ascending = order_col.selectbox('Order', ['Ascending', 'Descending'], key=f'{name}_order') == 'Ascending'
+    filter_column = filter_col.selectbox('Filter column', [None] + columns, format_func=lambda column: column or '(none)', key=f'{name}_filter_column')
+    filter_text = value_col.text_input('Filter value', key=f'{name}_filter_text', help='Text to match, or >, <, >=, <=, = with a number')
+    sensors = ()
+    if 'sensor_name' in columns:
+        names = df['sensor_name']
+        options = list(names.cat.categories) if isinstance(names.dtype, pd.CategoricalDtype) else sorted(names.dropna().unique())
+        sensors = tuple(st.multiselect('Sensors', options, key=f'{name}_sensors'))
+    positions = table_positions(token, name, df, sensors, *time_range, filter_column, filter_text, sort_column, ascending)
+    size_col, page_col, info_col = st.columns([1, 1, 3])
+    page_size = size_col.selectbox('Rows per page', PAGE_SIZES, index=1, key=f'{name}_page_size')
+    n_pages = page_count(len(positions), page_size)
+    page_key = f'{name}_page'
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = 1
+    page = page_col.number_input('Page', min_value=1, max_value=n_pages, step=1, key=page_key)
+    first = (page - 1) * page_size
+    last = min(first + page_size, len(positions))
+    info_col.caption(f'Rows {first + 1 if last else 0:,}-{last:,} of {len(positions):,} matching ({len(df):,} total), page {page} of {n_pages}')
+    st.dataframe(page_frame(df, positions, page, page_size, columns), hide_index=True)
+
+# Rollups are computed once per dataset and analysis settings, then queried
 @st.cache_data(show_spinner=False)
-def to_xlsx_bytes(df):
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False)
-    return buffer.getvalue()
+def run_rollups(file_hash, _merged_thi, _wind_merged, analysis_params):
+    key = cache_key(file_hash, 'rollup', **analysis_params)
+    rollups = load_frames(key)
+    if rollups is None:
+        rollups = build_rollups(_merged_thi, _wind_merged)
+        store_frames(key, rollups)
+    return rollups
+
+def rollup_section(rollups, time_range, max_points, profiler):
+    st.subheader('Rollup THI & Wind Chill per Lokasi')
+    max_buckets = st.number_input('Max buckets per location', min_value=10, value=DEFAULT_MAX_BUCKETS, step=50)
+    for kind, value_column, title in (('thi', 'THI', 'THI'), ('wci', 'WCI', 'Wind Chill Index')):
+        with profiler.stage(f'rollup_query_{kind}') as record:
+            level, frame = query_rollup(rollups, kind, *time_range, max_buckets=max_buckets)
+            record['rows_out'] = len(frame)
+        if frame.empty:
+            continue
+        st.markdown(f'**Ringkasan {title} per lokasi** (resolusi: {level})')
+        st.dataframe(summarize_rollup(frame, kind))
+        fig = time_series_figure(
+            frame,
+            [(f'{value_column} mean', f'{value_column} mean'), (f'{value_column} max', f'{value_column} max')],
+            f'{title} per {level}',
+            value_column,
+            (None, None),
+            max_points,
+            group_column='location',
+            time_column='bucket'
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+def export_section(frame, name, label, token, profiler):
+    # Exports are only built when requested; the result stays in the session
+    # until the data or settings (token) change. frame may be a callable so
+    # derived tables are not assembled unless exported.
+    formats = list(EXPORT_FORMATS)
+    col_format, col_action = st.columns([2, 3])
+    export_format = col_format.selectbox(f'{label} export format', formats, key=f'{name}_export_format', label_visibility='collapsed')
+    extension, mime = EXPORT_FORMATS[export_format]
+    state_key = f'export_{name}'
+    prepared = st.session_state.get(state_key)
+    if prepared is not None and prepared[0] == (export_format, token):
+        col_action.download_button(f'Download {label} ({export_format})', prepared[1], file_name=f'{name}.{extension}', mime=mime, key=f'{name}_download')
+    elif col_action.button(f'Prepare {label} ({export_format})', key=f'{name}_prepare'):
+        with st.spinner(f'Building {export_format} export...'), profiler.stage(f'export_{name}') as record:
+            frame = frame() if callable(frame) else frame
+            record['rows_in'] = len(frame)
+            data = build_export(frame, export_format)
+        st.session_state[state_key] = ((export_format, token), data)
+        col_action.download_button(f'Download {label} ({export_format})', data, file_name=f'{name}.{extension}', mime=mime, key=f'{name}_download')
+
+@st.cache_data(show_spinner=False)
+def load_location_map(uploaded_file):
+    return read_location_map(uploaded_file)
+
+def time_series_figure(df, series, title, yaxis_title, time_range, max_points, group_column='sensor_name', time_column='record_datetime'):
+    # One Scattergl line per sensor and value column, each downsampled on the
+    # server to at most max_points within the selected time range.
+    fig = go.Figure()
+    for value_column, label in series:
+        sampled = downsample_frame(df, value_column, group_column, max_points, *time_range, time_column=time_column)
+        for sensor, group in sampled.groupby(group_column, observed=True):
+            fig.add_trace(go.Scattergl(
+                x=group[time_column],
+                y=group[value_column],
+                mode='lines',
+                name=f'{label} {sensor}'.strip(),
+                hovertemplate=f'Waktu: %{{x}}<br>{label or sensor}: %{{y:.2f}}'
+            ))
+    fig.update_layout(
+        xaxis_title='Datetime',
+        yaxis_title=yaxis_title,
+        title=title,
+        hovermode='x unified',
+        template='plotly_white',
+        margin=dict(l=40, r=40, t=60, b=40)
+    )
+    return fig
+
+def chart_time_range(df):
+    time_min = df['record_datetime'].min()
+    time_max = df['record_datetime'].max()
+    if pd.isna(time_min) or time_min >= time_max:
+        return None, None
+    # Without a step Streamlit falls back to one day for datetimes; step by
+    # seconds on short captures and by minutes otherwise
+    if time_max - time_min <= pd.Timedelta(hours=1):
+        step, freq, display = timedelta(seconds=1), 's', 'YYYY-MM-DD HH:mm:ss'
+    else:
+        step, freq, display = timedelta(minutes=1), 'min', 'YYYY-MM-DD HH:mm'
+    # Snap the bounds outward to the step so every reading stays selectable
+    low = time_min.floor(freq).to_pydatetime()
+    high = time_max.ceil(freq).to_pydatetime()
+    return st.sidebar.slider(
+        'Time range',
+        min_value=low,
+        max_value=high,
+        value=(low, high),
+        step=step,
+        format=display
+    )
+
+def alignment_settings():
+    st.sidebar.header('Sensor Alignment')
+    tolerance_seconds = st.sidebar.number_input('Time tolerance (seconds)', min_value=0, value=60, step=10)
+    mapping_file = st.sidebar.file_uploader('Sensor location mapping (CSV: sensor_name, location)', type=['csv'])
+    location_map = load_location_map(mapping_file) if mapping_file is not None else None
+    return tolerance_seconds, location_map
+
+def render_live(directory, max_points):
+    feed = st.session_state['live_feed']
+    start = time.perf_counter()
+    appended = feed.poll_directory(directory)
+    st.caption(
+        f"{feed.rows_received:,} rows received, {appended:,} new in this update "
+        f"({time.perf_counter() - start:.2f} s). Latest reading: {feed.watermark}"
+    )
+    for path, error in feed.errors.items():
+        st.warning(f'Skipped {os.path.basename(path)}: {error}')
+    for name, title in (('thi', 'Kategori Stress (THI)'), ('wci', 'Kategori Wind Chill'), ('combined', 'Interpretasi Gabungan')):
+        if feed.counts[name]:
+            st.markdown(f'**{title}:**')
+            st.bar_chart(pd.Series(feed.counts[name], name='Jumlah data'))
+    for name, column, title in (('thi', 'THI', 'THI (terbaru)'), ('wci', 'WCI', 'Wind Chill Index (terbaru)')):
+        if not feed.tails[name].empty:
+            st.plotly_chart(time_series_figure(feed.tails[name], [(column, column)], title, column, (None, None), max_points), use_container_width=True)
+
+def live_dashboard():
+    directory = st.sidebar.text_input('Drop directory', value='incoming')
+    refresh_seconds = st.sidebar.number_input('Refresh every (seconds)', min_value=1, value=5)
+    tolerance_seconds, location_map = alignment_settings()
+    max_points = st.sidebar.number_input('Max points per sensor', min_value=100, value=DEFAULT_MAX_POINTS, step=500)
+    # The feed keeps running counts between reruns; changing what it is
+    # aligned with starts a fresh one
+    settings = (directory, tolerance_seconds, location_map)
+    if st.session_state.get('live_settings') != settings:
+        st.session_state['live_feed'] = LiveFeed(location_map, tolerance_seconds)
+        st.session_state['live_settings'] = settings
+    st.subheader('Live Sensor Feed')
+    st.fragment(run_every=refresh_seconds)(render_live)(directory, max_points)
+
+# Sources are identified by content hash (uploads) or path, size and mtime
+# (folder files); the file contents themselves are not hashed again
+@st.cache_data(show_spinner=False)
+def run_comparison(upload_hashes, _uploads, path_signatures, location_map, tolerance_seconds):
+    summaries = []
+    failures = []
+    if _uploads:
+        upload_summaries, upload_failures = summarize_uploads(_uploads, location_map, tolerance_seconds)
+        summaries += upload_summaries
+        failures += upload_failures
+    if path_signatures:
+        # Labels already used by uploads are taken, so folder files stay distinct
+        taken = [summary['source'] for summary in summaries] + [label for label, _ in failures]
+        path_summaries, path_failures = summarize_paths([path for path, _, _ in path_signatures], location_map, tolerance_seconds, taken=taken)
+        summaries += path_summaries
+        failures += path_failures
+    return summaries, failures
+
+def comparison_bar(table, colors, title):
+    fig = go.Figure([
+        go.Bar(y=table.index, x=table[label], name=label, orientation='h', marker_color=colors.get(label, '#9E9E9E'),
+               hovertemplate=f'%{{y}}<br>{label}: %{{x:.1f}}%<extra></extra>')
+        for label in table.columns
+    ])
+    fig.update_layout(barmode='stack', title=title, xaxis_title='Proporsi (%)', template='plotly_white',
+                      margin=dict(l=40, r=40, t=60, b=40), height=max(300, 40 * len(table) + 150))
+    return fig
+
+def comparison_view(uploaded_files, folder, profiler):
+    tolerance_seconds, location_map = alignment_settings()
+    uploads = [(uploaded.name, uploaded.getvalue()) for uploaded in uploaded_files]
+    paths = folder_files(folder) if folder else []
+    if folder and not paths:
+        st.warning(f'No CSV/XLSX/Parquet/Feather files found in {folder}')
+    if not uploads and not paths:
+        return
+    path_signatures = tuple((path, os.path.getsize(path), os.path.getmtime(path)) for path in paths)
+    upload_hashes = tuple(content_hash(data) for _, data in uploads)
+    with profiler.stage('compare_sources') as record:
+        start = time.perf_counter()
+        with st.spinner(f'Loading and analysing {len(uploads) + len(paths)} files in parallel...'):
+            summaries, failures = run_comparison(upload_hashes, uploads, path_signatures, location_map, tolerance_seconds)
+        elapsed = time.perf_counter() - start
+        record['rows_out'] = sum(summary['rows'] for summary in summaries)
+    st.subheader('Perbandingan Antar Sumber')
+    for label, error in failures:
+        st.warning(f'Skipped {label}: {error}')
+    if not summaries:
+        return
+    overview = pd.DataFrame(
+        [{'Sumber': summary['source'], 'Jumlah data': summary['rows'], 'Waktu proses (s)': round(summary['seconds'], 2)} for summary in summaries]
+    )
+    st.dataframe(overview, hide_index=True)
+    st.caption(f"Total {elapsed:.2f} s for {len(summaries)} files (sum of per-file times: {overview['Waktu proses (s)'].sum():.2f} s)")
+    for kind, colors, title in (
+        ('thi', THI_COLORS, 'Proporsi Kategori Stress (THI) per Sumber'),
+        ('wci', WCI_COLORS, 'Proporsi Wind Chill Effect per Sumber'),
+        ('combined', COMBINED_COLORS, 'Proporsi Interpretasi Gabungan per Sumber')
+    ):
+        table = proportion_table(summaries, kind)
+        if table.empty:
+            continue
+        st.plotly_chart(comparison_bar(table, colors, title), use_container_width=True)
+        st.markdown('**Proporsi per lokasi (%):**')
+        st.dataframe(location_table(summaries, kind).round(1))
 
 def main():
     st.set_page_config(page_title="IoT Data Viewer", page_icon="📊")
     st.title('IoT Data Viewer')
-    uploaded_file = st.file_uploader("Upload CSV/XLSX file", type=['csv', 'xlsx'])
+    st.sidebar.header('Live Mode')
+    if st.sidebar.checkbox('Watch drop directory', value=False):
+        live_dashboard()
+        return
+    show_profiling = st.sidebar.checkbox('Show profiling panel', value=False)
+    profiling_panel = st.sidebar.container()
+    # A profiler is created per rerun; the id stays fixed for the browser
+    # session so its metrics can be grouped
+    if 'profiling_session' not in st.session_state:
+        st.session_state['profiling_session'] = new_session_id()
+    profiler = StageProfiler(session_id=st.session_state['profiling_session'])
+    uploaded_files = st.file_uploader("Upload CSV/XLSX/Parquet/Feather file(s)", type=SUPPORTED_TYPES, accept_multiple_files=True)
+    st.sidebar.header('Compare Sources')
+    compare_folder = st.sidebar.text_input('Folder on the server (optional)', value='')
+    uploaded_file = None
+    if len(uploaded_files) > 1 or compare_folder:
+        try:
+            comparison_view(uploaded_files, compare_folder, profiler)
+        except Exception as e:
+            st.error(f"Error reading files: {str(e)}")
+    elif uploaded_files:
+        uploaded_file = uploaded_files[0]
     if uploaded_file is not None:
         try:
-            df = load_file(uploaded_file)
+            with profiler.stage('load') as record:
+                df, load_seconds, file_hash, from_cache = load_file(uploaded_file)
+                record['rows_out'] = len(df)
+            source = 'disk cache' if from_cache else 'file'
+            st.caption(f"Loaded {len(df):,} rows from {source} in {load_seconds:.2f} s, {memory_mb(df):.1f} MB in memory")
             st.sidebar.header('Filter Sensor Types')
             show_temp = st.sidebar.checkbox('Show Temperature', value=True)
             show_humidity = st.sidebar.checkbox('Show Humidity', value=True)
             show_wind = st.sidebar.checkbox('Show Wind Speed', value=True)
-            temp_keywords = ['temp', 'temperature']
-            humidity_keywords = ['humidity', 'hum']
-            wind_keywords = ['wind']
-            def sensor_type(name, keywords):
-                return any(kw.lower() in str(name).lower() for kw in keywords)
-            temp_df = pd.DataFrame()
-            humidity_df = pd.DataFrame()
-            wind_df = pd.DataFrame()
-            if show_temp:
-                temp_df = df[df['sensor_name'].apply(lambda x: sensor_type(x, temp_keywords))]
-                temp_df = temp_df.sort_values(['sensor_name', 'record_datetime'])
-                if not temp_df.empty:
-                    st.subheader('Temperature Data')
-                    st.dataframe(temp_df[['record_datetime', 'sensor_name', 'value_calibration', 'sensor_unit']])
-                    st.line_chart(temp_df.set_index('record_datetime')['value_calibration'])
-                    st.download_button('Download Temperature Data (CSV)', to_csv_bytes(temp_df), file_name='temperature_data.csv', mime='text/csv')
-                    st.download_button('Download Temperature Data (XLSX)', to_xlsx_bytes(temp_df), file_name='temperature_data.xlsx', mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-            if show_humidity:
-                humidity_df = df[df['sensor_name'].apply(lambda x: sensor_type(x, humidity_keywords))]
-                humidity_df = humidity_df.sort_values(['sensor_name', 'record_datetime'])
-                if not humidity_df.empty:
-                    st.subheader('Humidity Data')
-                    st.dataframe(humidity_df[['record_datetime', 'sensor_name', 'value_calibration', 'sensor_unit']])
-                    st.line_chart(humidity_df.set_index('record_datetime')['value_calibration'])
-                    st.download_button('Download Humidity Data (CSV)', to_csv_bytes(humidity_df), file_name='humidity_data.csv', mime='text/csv')
-                    st.download_button('Download Humidity Data (XLSX)', to_xlsx_bytes(humidity_df), file_name='humidity_data.xlsx', mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-            if show_wind:
-                wind_df = df[df['sensor_name'].apply(lambda x: sensor_type(x, wind_keywords))]
-                if not wind_df.empty:
-                    st.subheader('Wind Speed Data')
-                    st.dataframe(wind_df[['record_datetime', 'sensor_name', 'value_calibration', 'sensor_unit']])
-                    st.line_chart(wind_df.set_index('record_datetime')['value_calibration'])
+            tolerance_seconds, location_map = alignment_settings()
+            st.sidebar.header('Charts')
+            time_range = chart_time_range(df)
+            max_points = st.sidebar.number_input('Max points per sensor', min_value=100, value=DEFAULT_MAX_POINTS, step=500)
+            with profiler.stage('analysis', len(df)):
+                result = run_analysis(file_hash, df, show_temp, show_humidity, show_wind, location_map, tolerance_seconds, profiler)
+            analysis_params = dict(
+                show_temp=show_temp,
+                show_humidity=show_humidity,
+                show_wind=show_wind,
+                location_map=location_map,
+                tolerance_seconds=tolerance_seconds
+            )
+            data_token = cache_key(file_hash, 'tables', **analysis_params)
+            stats = cache_stats()
+            st.sidebar.caption(
+                f"Disk cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['entries']} entries ({stats['size_mb']:.1f} MB)"
+            )
+            temp_df = result['temp']
+            humidity_df = result['humidity']
+            wind_df = result['wind']
+            merged_thi = result['thi']
+            wind_merged = result['wci']
+            combined = result['combined']
+            del result
+            if not temp_df.empty:
+                st.subheader('Temperature Data')
+                with profiler.stage('render_temperature', len(temp_df)):
+                    paged_table(temp_df, 'temperature_table', data_token, time_range, ['record_datetime', 'sensor_name', 'value_calibration', 'sensor_unit'])
+                    st.plotly_chart(time_series_figure(temp_df, [('value_calibration', '')], 'Temperature', 'Temperature', time_range, max_points), use_container_width=True)
+                export_section(temp_df, 'temperature_data', 'Temperature Data', data_token, profiler)
+            if not humidity_df.empty:
+                st.subheader('Humidity Data')
+                with profiler.stage('render_humidity', len(humidity_df)):
+                    paged_table(humidity_df, 'humidity_table', data_token, time_range, ['record_datetime', 'sensor_name', 'value_calibration', 'sensor_unit'])
+                    st.plotly_chart(time_series_figure(humidity_df, [('value_calibration', '')], 'Humidity', 'Humidity', time_range, max_points), use_container_width=True)
+                export_section(humidity_df, 'humidity_data', 'Humidity Data', data_token, profiler)
+            if not wind_df.empty:
+                st.subheader('Wind Speed Data')
+                with profiler.stage('render_wind', len(wind_df)):
+                    paged_table(wind_df, 'wind_table', data_token, time_range, ['record_datetime', 'sensor_name', 'value_calibration', 'sensor_unit'])
+                    st.plotly_chart(time_series_figure(wind_df, [('value_calibration', '')], 'Wind Speed', 'Wind Speed', time_range, max_points), use_container_width=True)
             if show_temp and show_humidity and not temp_df.empty and not humidity_df.empty:
-                combined_df = pd.concat([temp_df, humidity_df]).sort_values(['sensor_name', 'record_datetime'])
-                st.download_button(
-                    label='Download Combined Temperature & Humidity (XLSX)',
-                    data=to_xlsx_bytes(combined_df),
-                    file_name='combined_temp_humidity.xlsx',
-                    mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                export_section(
+                    lambda: pd.concat([temp_df, humidity_df]).sort_values(['sensor_name', 'record_datetime']),
+                    'combined_temp_humidity',
+                    'Combined Temperature & Humidity',
+                    data_token,
+                    profiler
                 )
             # THI Calculation
-            merged_thi = pd.DataFrame()
-            if show_temp and show_humidity and not temp_df.empty and not humidity_df.empty:
-                merged_thi = pd.merge(
-                    temp_df,
-                    humidity_df,
-                    on=['record_datetime', 'sensor_name'],
-                    suffixes=('_temp', '_hum'),
-                    how='inner'
-                )
-                if merged_thi.empty:
-                    merged_thi = pd.merge(
-                        temp_df,
-                        humidity_df,
-                        on='record_datetime',
-                        suffixes=('_temp', '_hum'),
-                        how='inner'
-                    )
-                    if 'sensor_name_temp' in merged_thi.columns and 'sensor_name_hum' in merged_thi.columns:
-                        merged_thi['sensor_name'] = merged_thi['sensor_name_temp'].combine_first(merged_thi['sensor_name_hum'])
-                    else:
-                        merged_thi['sensor_name'] = ''
-                if not merged_thi.empty:
-                    merged_thi['THI'] = merged_thi['value_calibration_temp'] - (
-                        (0.55 - 0.0055 * merged_thi['value_calibration_hum']) * (merged_thi['value_calibration_temp'] - 14.5)
-                    )
-                    def interpret_thi(thi):
-                        if thi < 27:
-                            return 'Aman (Normal)'
-                        elif 27 <= thi < 28:
-                            return 'Waspada (Stress Ringan)'
-                        elif 28 <= thi < 30:
-                            return 'Stress Sedang'
-                        else:
-                            return 'Stress Berat'
-                    merged_thi['THI_Interpretasi'] = merged_thi['THI'].apply(interpret_thi)
-                    st.subheader('Temperature Humidity Index (THI) for Broiler Chicken')
-                    st.dataframe(merged_thi[['record_datetime', 'sensor_name', 'value_calibration_temp', 'value_calibration_hum', 'THI', 'THI_Interpretasi']])
-                    st.line_chart(merged_thi.set_index('record_datetime')['THI'])
-                    st.markdown('**Ringkasan Kategori Stress Ayam Broiler:**')
-                    st.write(merged_thi['THI_Interpretasi'].value_counts())
-                    color_map_thi = {
-                        'Aman (Normal)': '#4CAF50',
-                        'Waspada (Stress Ringan)': '#FFEB3B',
-                        'Stress Sedang': '#FF9800',
-                        'Stress Berat': '#F44336'
-                    }
-                    thi_counts = merged_thi['THI_Interpretasi'].value_counts()
-                    thi_labels = thi_counts.index.tolist()
-                    thi_colors = [color_map_thi.get(label, '#9E9E9E') for label in thi_labels]
+            if not merged_thi.empty:
+                st.subheader('Temperature Humidity Index (THI) for Broiler Chicken')
+                with profiler.stage('render_thi', len(merged_thi)):
+                    paged_table(merged_thi, 'thi_table', data_token, time_range, THI_COLUMNS)
+                    st.plotly_chart(time_series_figure(merged_thi, [('THI', 'THI')], 'THI', 'THI', time_range, max_points), use_container_width=True)
+                st.markdown('**Ringkasan Kategori Stress Ayam Broiler:**')
+                st.write(category_counts(merged_thi['THI_Interpretasi']))
+                thi_counts = category_counts(merged_thi['THI_Interpretasi'])
+                thi_labels = thi_counts.index.tolist()
+                thi_colors = [THI_COLORS.get(label, '#9E9E9E') for label in thi_labels]
+                with profiler.stage('pie_thi'):
                     fig_thi, ax_thi = plt.subplots()
                     ax_thi.pie(
                         thi_counts,
@@ -138,20 +445,10 @@ def main():
                     ax_thi.legend(thi_labels, title='Kategori', loc='center left', bbox_to_anchor=(1, 0.5))
                     st.pyplot(fig_thi)
                     plt.close(fig_thi)
-                    summary = merged_thi['THI_Interpretasi'].value_counts()
-                    total = summary.sum()
-                    kesimpulan = ''
-                    if summary.get('Stress Berat', 0) > 0:
-                        kesimpulan += f"Terdapat {summary.get('Stress Berat', 0)} data (" + f"{summary.get('Stress Berat', 0)/total*100:.1f}%" + ") ayam dalam kondisi STRESS BERAT. Segera lakukan tindakan perbaikan lingkungan!\n"
-                    if summary.get('Stress Sedang', 0) > 0:
-                        kesimpulan += f"Terdapat {summary.get('Stress Sedang', 0)} data (" + f"{summary.get('Stress Sedang', 0)/total*100:.1f}%" + ") ayam dalam kondisi STRESS SEDANG. Perlu peningkatan ventilasi dan pengelolaan suhu!\n"
-                    if summary.get('Waspada (Stress Ringan)', 0) > 0:
-                        kesimpulan += f"Terdapat {summary.get('Waspada (Stress Ringan)', 0)} data (" + f"{summary.get('Waspada (Stress Ringan)', 0)/total*100:.1f}%" + ") ayam dalam kondisi WASPADA (STRESS RINGAN). Monitor kondisi kandang secara berkala.\n"
-                    if summary.get('Aman (Normal)', 0) > 0:
-                        kesimpulan += f"Sebagian besar data ({summary.get('Aman (Normal)', 0)}/{total}) ayam dalam kondisi AMAN (NORMAL)."
-                    st.markdown('**Kesimpulan Otomatis:**')
-                    st.info(kesimpulan)
-                    st.markdown('''**Saran Pencegahan dan Perbaikan:**
+                kesimpulan = thi_conclusion(thi_counts)
+                st.markdown('**Kesimpulan Otomatis:**')
+                st.info(kesimpulan)
+                st.markdown('''**Saran Pencegahan dan Perbaikan:**
 - Pastikan ventilasi kandang cukup dan lancar.
 - Gunakan kipas atau sistem pendingin evaporatif jika suhu tinggi.
 - Sediakan air minum yang cukup dan segar.
@@ -159,60 +456,22 @@ def main():
 - Lakukan penyiraman lantai atau atap kandang saat cuaca panas.
 - Monitor suhu dan kelembaban secara berkala, terutama pada siang hari.
 - Segera lakukan tindakan jika proporsi stress sedang/berat meningkat.''')
-                    st.markdown('''**Referensi:**  
+                st.markdown('''**Referensi:**  
 Zulbardi, Z., et al. (2019). "Temperature Humidity Index (THI) dan Pengaruhnya terhadap Produksi dan Kesehatan Ayam Broiler." Jurnal Ilmu Ternak dan Veteriner, 24(2), 123-130.  
 Serta sumber-sumber lain terkait manajemen lingkungan ayam broiler di Indonesia.''')
-                    st.download_button(
-                        label='Download THI Data (XLSX)',
-                        data=to_xlsx_bytes(merged_thi),
-                        file_name='thi_broiler.xlsx',
-                        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                    )
+                export_section(merged_thi, 'thi_broiler', 'THI Data', data_token, profiler)
             # Wind Chill Effect Calculation
-            wind_merged = pd.DataFrame()
-            if show_temp and show_wind and not temp_df.empty and not wind_df.empty:
-                wind_merged = pd.merge(
-                    temp_df,
-                    wind_df,
-                    on=['record_datetime', 'sensor_name'],
-                    suffixes=('_temp', '_wind'),
-                    how='inner'
-                )
-                if wind_merged.empty:
-                    wind_merged = pd.merge(
-                        temp_df,
-                        wind_df,
-                        on='record_datetime',
-                        suffixes=('_temp', '_wind'),
-                        how='inner'
-                    )
-                    if 'sensor_name_temp' in wind_merged.columns and 'sensor_name_wind' in wind_merged.columns:
-                        wind_merged['sensor_name'] = wind_merged['sensor_name_temp'].combine_first(wind_merged['sensor_name_wind'])
-                    else:
-                        wind_merged['sensor_name'] = ''
-                if not wind_merged.empty:
-                    wind_merged['WCI'] = wind_merged['value_calibration_temp'] - (wind_merged['value_calibration_wind'] * 0.7)
-                    def interpret_wci(wci):
-                        if wci < 24:
-                            return 'Risiko Kedinginan (Wind Chill Tinggi)'
-                        elif 24 <= wci < 27:
-                            return 'Cukup Dingin (Perlu Waspada)'
-                        else:
-                            return 'Aman (Normal)'
-                    wind_merged['WCI_Interpretasi'] = wind_merged['WCI'].apply(interpret_wci)
-                    st.subheader('Wind Chill Effect pada Ayam Broiler')
-                    st.dataframe(wind_merged[['record_datetime', 'sensor_name', 'value_calibration_temp', 'value_calibration_wind', 'WCI', 'WCI_Interpretasi']])
-                    st.line_chart(wind_merged.set_index('record_datetime')['WCI'])
-                    st.markdown('**Ringkasan Kategori Wind Chill Effect:**')
-                    st.write(wind_merged['WCI_Interpretasi'].value_counts())
-                    color_map_wci = {
-                        'Aman (Normal)': '#4CAF50',
-                        'Cukup Dingin (Perlu Waspada)': '#2196F3',
-                        'Risiko Kedinginan (Wind Chill Tinggi)': '#9C27B0'
-                    }
-                    wci_counts = wind_merged['WCI_Interpretasi'].value_counts()
-                    wci_labels = wci_counts.index.tolist()
-                    wci_colors = [color_map_wci.get(label, '#9E9E9E') for label in wci_labels]
+            if not wind_merged.empty:
+                st.subheader('Wind Chill Effect pada Ayam Broiler')
+                with profiler.stage('render_wci', len(wind_merged)):
+                    paged_table(wind_merged, 'wci_table', data_token, time_range, WCI_COLUMNS)
+                    st.plotly_chart(time_series_figure(wind_merged, [('WCI', 'WCI')], 'Wind Chill Index', 'WCI', time_range, max_points), use_container_width=True)
+                st.markdown('**Ringkasan Kategori Wind Chill Effect:**')
+                st.write(category_counts(wind_merged['WCI_Interpretasi']))
+                wci_counts = category_counts(wind_merged['WCI_Interpretasi'])
+                wci_labels = wci_counts.index.tolist()
+                wci_colors = [WCI_COLORS.get(label, '#9E9E9E') for label in wci_labels]
+                with profiler.stage('pie_wci'):
                     fig_wci, ax_wci = plt.subplots()
                     ax_wci.pie(
                         wci_counts,
@@ -226,123 +485,63 @@ Serta sumber-sumber lain terkait manajemen lingkungan ayam broiler di Indonesia.
                     ax_wci.legend(wci_labels, title='Kategori', loc='center left', bbox_to_anchor=(1, 0.5))
                     st.pyplot(fig_wci)
                     plt.close(fig_wci)
-                    wci_summary = wind_merged['WCI_Interpretasi'].value_counts()
-                    wci_total = wci_summary.sum()
-                    wci_kesimpulan = ''
-                    if wci_summary.get('Risiko Kedinginan (Wind Chill Tinggi)', 0) > 0:
-                        wci_kesimpulan += f"Terdapat {wci_summary.get('Risiko Kedinginan (Wind Chill Tinggi)', 0)} data (" + f"{wci_summary.get('Risiko Kedinginan (Wind Chill Tinggi)', 0)/wci_total*100:.1f}%" + ") ayam berisiko kedinginan akibat efek angin tinggi.\n"
-                    if wci_summary.get('Cukup Dingin (Perlu Waspada)', 0) > 0:
-                        wci_kesimpulan += f"Terdapat {wci_summary.get('Cukup Dingin (Perlu Waspada)', 0)} data (" + f"{wci_summary.get('Cukup Dingin (Perlu Waspada)', 0)/wci_total*100:.1f}%" + ") ayam dalam kondisi cukup dingin, perlu waspada.\n"
-                    if wci_summary.get('Aman (Normal)', 0) > 0:
-                        wci_kesimpulan += f"Sebagian besar data ({wci_summary.get('Aman (Normal)', 0)}/{wci_total}) ayam dalam kondisi aman dari wind chill."
-                    st.markdown('**Kesimpulan Wind Chill Effect:**')
-                    st.info(wci_kesimpulan)
-                    st.markdown('''**Saran Pencegahan dan Perbaikan Wind Chill:**
+                wci_kesimpulan = wci_conclusion(wci_counts)
+                st.markdown('**Kesimpulan Wind Chill Effect:**')
+                st.info(wci_kesimpulan)
+                st.markdown('''**Saran Pencegahan dan Perbaikan Wind Chill:**
 - Tutup celah kandang saat angin kencang atau malam hari.
 - Tambahkan tirai atau penghalang angin di sisi kandang yang terbuka.
 - Pastikan ayam tidak langsung terpapar angin kencang.
 - Sediakan pemanas tambahan jika suhu dan wind chill sangat rendah.
 - Monitor wind speed dan suhu secara berkala, terutama saat cuaca ekstrem.''')
-                    st.markdown('''**Referensi:**  
+                st.markdown('''**Referensi:**  
 SNI 01-4869.3-2008. Tata Cara Perancangan Lingkungan dan Bangunan Kandang Ayam Pedaging (Broiler).  
 Serta sumber-sumber lain terkait wind chill effect pada unggas tropis.''')
-                    st.download_button(
-                        label='Download Wind Chill Data (XLSX)',
-                        data=to_xlsx_bytes(wind_merged),
-                        file_name='wind_chill_broiler.xlsx',
-                        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                    )
+                export_section(wind_merged, 'wind_chill_broiler', 'Wind Chill Data', data_token, profiler)
+            # Multi-resolution rollups per location
+            if not merged_thi.empty or not wind_merged.empty:
+                with profiler.stage('rollup_build', len(merged_thi) + len(wind_merged)):
+                    rollups = run_rollups(file_hash, merged_thi, wind_merged, analysis_params)
+                rollup_section(rollups, time_range, max_points, profiler)
             # Gabungan THI dan Wind Chill Effect
-            if show_temp and show_humidity and show_wind and not temp_df.empty and not humidity_df.empty and not wind_df.empty and not merged_thi.empty and not wind_merged.empty:
-                thi_df = merged_thi[['record_datetime', 'sensor_name', 'value_calibration_temp', 'value_calibration_hum', 'THI', 'THI_Interpretasi']].copy()
-                del merged_thi
-                wci_df = wind_merged[['record_datetime', 'sensor_name', 'value_calibration_wind', 'WCI', 'WCI_Interpretasi']].copy()
-                del wind_merged
-                combined = pd.merge(
-                    thi_df,
-                    wci_df,
-                    on=['record_datetime', 'sensor_name'],
-                    how='inner'
-                )
-                def interpretasi_gabungan(row):
-                    if row['THI_Interpretasi'] in ['Stress Berat', 'Stress Sedang'] or row['WCI_Interpretasi'] == 'Risiko Kedinginan (Wind Chill Tinggi)':
-                        return 'Risiko Tinggi: Segera lakukan perbaikan lingkungan!'
-                    elif row['THI_Interpretasi'] == 'Waspada (Stress Ringan)' or row['WCI_Interpretasi'] == 'Cukup Dingin (Perlu Waspada)':
-                        return 'Waspada: Monitor dan lakukan pencegahan.'
-                    else:
-                        return 'Aman'
-                combined['Interpretasi Gabungan'] = combined.apply(interpretasi_gabungan, axis=1)
-                def saran_gabungan(row):
-                    if row['Interpretasi Gabungan'] == 'Risiko Tinggi: Segera lakukan perbaikan lingkungan!':
-                        return 'Perbaiki ventilasi, tambahkan pendingin/pemanas, kurangi kepadatan, dan lindungi dari angin.'
-                    elif row['Interpretasi Gabungan'] == 'Waspada: Monitor dan lakukan pencegahan.':
-                        return 'Pantau suhu, kelembaban, dan angin secara berkala, lakukan tindakan preventif.'
-                    else:
-                        return 'Pertahankan kondisi kandang saat ini.'
-                combined['Saran Pencegahan'] = combined.apply(saran_gabungan, axis=1)
+            if not combined.empty:
                 st.subheader('Tabel Gabungan THI & Wind Chill Effect')
-                st.dataframe(combined)
+                with profiler.stage('render_combined', len(combined)):
+                    paged_table(combined, 'combined_table', data_token, time_range)
                 st.markdown('**Grafik Time Series Gabungan THI & Wind Chill (Interaktif):**')
-                combined['record_datetime'] = pd.to_datetime(combined['record_datetime'])
-                fig = go.Figure([
-                    go.Scatter(
-                        x=combined['record_datetime'],
-                        y=combined['THI'],
-                        mode='lines+markers',
-                        name='THI',
-                        line=dict(color='#F44336'),
-                        marker=dict(symbol='circle', size=7),
-                        hovertemplate='Waktu: %{x}<br>THI: %{y:.2f}'
-                    ),
-                    go.Scatter(
-                        x=combined['record_datetime'],
-                        y=combined['WCI'],
-                        mode='lines+markers',
-                        name='Wind Chill Index',
-                        line=dict(color='#2196F3'),
-                        marker=dict(symbol='square', size=7),
-                        hovertemplate='Waktu: %{x}<br>WCI: %{y:.2f}'
+                with profiler.stage('plotly_combined', len(combined)):
+                    fig = time_series_figure(
+                        combined,
+                        [('THI', 'THI'), ('WCI', 'WCI')],
+                        'Time Series THI & Wind Chill Index',
+                        'Nilai Indeks',
+                        time_range,
+                        max_points
                     )
-                ])
-                fig.update_layout(
-                    xaxis_title='Datetime',
-                    yaxis_title='Nilai Indeks',
-                    title='Time Series THI & Wind Chill Index',
-                    legend=dict(x=0, y=1),
-                    hovermode='x unified',
-                    template='plotly_white',
-                    margin=dict(l=40, r=40, t=60, b=40)
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(fig, use_container_width=True)
                 st.markdown('**Ringkasan & Visualisasi Proporsi Interpretasi Gabungan:**')
-                summary_combined = combined['Interpretasi Gabungan'].value_counts()
+                summary_combined = category_counts(combined['Interpretasi Gabungan'])
                 st.write(summary_combined)
-                color_map_combined = {
-                    'Aman': '#4CAF50',
-                    'Waspada: Monitor dan lakukan pencegahan.': '#FFEB3B',
-                    'Risiko Tinggi: Segera lakukan perbaikan lingkungan!': '#F44336'
-                }
                 labels = summary_combined.index.tolist()
-                colors = [color_map_combined.get(label, '#9E9E9E') for label in labels]
-                fig_comb, ax_comb = plt.subplots()
-                ax_comb.pie(summary_combined, labels=labels, autopct='%1.1f%%', colors=colors, startangle=140, textprops={'fontsize': 12})
-                ax_comb.set_title('Proporsi Interpretasi Gabungan THI & Wind Chill', fontsize=14, fontweight='bold')
-                ax_comb.legend(labels, title='Kategori', loc='center left', bbox_to_anchor=(1, 0.5))
-                st.pyplot(fig_comb)
-                plt.close(fig_comb)
-                st.download_button(
-                    label='Download Gabungan THI & Wind Chill (XLSX)',
-                    data=to_xlsx_bytes(combined),
-                    file_name='gabungan_thi_windchill.xlsx',
-                    mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-                del thi_df
-                del wci_df
+                colors = [COMBINED_COLORS.get(label, '#9E9E9E') for label in labels]
+                with profiler.stage('pie_combined'):
+                    fig_comb, ax_comb = plt.subplots()
+                    ax_comb.pie(summary_combined, labels=labels, autopct='%1.1f%%', colors=colors, startangle=140, textprops={'fontsize': 12})
+                    ax_comb.set_title('Proporsi Interpretasi Gabungan THI & Wind Chill', fontsize=14, fontweight='bold')
+                    ax_comb.legend(labels, title='Kategori', loc='center left', bbox_to_anchor=(1, 0.5))
+                    st.pyplot(fig_comb)
+                    plt.close(fig_comb)
+                export_section(combined, 'gabungan_thi_windchill', 'Gabungan THI & Wind Chill', data_token, profiler)
                 del combined
             if not (show_temp or show_humidity or show_wind):
                 st.info('Please select at least one sensor type to display.')
         except Exception as e:
             st.error(f"Error reading file: {str(e)}")
+    profiler.flush()
+    if show_profiling:
+        with profiling_panel:
+            st.markdown('**Profiling (this run)**')
+            st.dataframe(profiler.frame(), hide_index=True)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+# Charts never need more points than there are pixels, so each series is reduced
+# to the min and max value of every time bucket before it is sent to the browser.
+# Keeping both extremes preserves spikes that plain decimation would drop.
+DEFAULT_MAX_POINTS = 2000
+
+def minmax_indices(times, values, max_points=DEFAULT_MAX_POINTS):
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    n_buckets = max(1, max_points // 2)
+    t = times.astype('datetime64[ns]').astype('int64')
+    span = t[-1] - t[0]
+    if span > 0:
+        buckets = ((t - t[0]) / span * (n_buckets - 1)).astype('int64')
+    else:
+        buckets = np.arange(n) * n_buckets // n
+    grouped = pd.Series(values).groupby(buckets, sort=False)
+    keep = np.concatenate([grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy(), [0, n - 1]])
+    return np.unique(keep.astype('int64'))
+
+def downsample_frame(df, value_column, group_column='sensor_name', max_points=DEFAULT_MAX_POINTS, start=None, end=None, time_column='record_datetime'):
+    # Downsamples every group (sensor) separately within the optional time
+    # window, so zooming into a shorter range brings back full detail.
+    frame = df[[time_column, group_column, value_column]].dropna()
+    if start is not None:
+        frame = frame[frame[time_column] >= start]
+    if end is not None:
+        frame = frame[frame[time_column] <= end]
+    parts = []
+    for _, group in frame.groupby(group_column, observed=True, sort=True):
+        group = group.sort_values(time_column, kind='stable')
+        indices = minmax_indices(group[time_column].to_numpy(), group[value_column].to_numpy(), max_points)
+        parts.append(group.iloc[indices])
+    if not parts:
+        return frame.iloc[:0]
+    return pd.concat(parts, ignore_index=True)
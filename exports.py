@@ -0,0 +1,85 @@
+import gzip
+import io
+
+from openpyxl import Workbook
+
+# Export builders write in chunks so memory stays close to the size of the
+# output instead of holding an extra full text/object copy of the table.
+EXCEL_MAX_ROWS = 1_048_576
+CHUNK_ROWS = 100_000
+XLSX_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+# Format label -> (file extension, mime type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'XLSX': ('xlsx', XLSX_MIME),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet')
+}
+
+def iter_chunks(df, chunk_rows=CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+def write_csv(df, handle, chunk_rows=CHUNK_ROWS):
+    for i, chunk in enumerate(iter_chunks(df, chunk_rows)):
+        handle.write(chunk.to_csv(index=False, header=(i == 0)).encode('utf-8'))
+    if df.empty:
+        handle.write(df.to_csv(index=False).encode('utf-8'))
+
+def csv_bytes(df, compress=False, chunk_rows=CHUNK_ROWS):
+    buffer = io.BytesIO()
+    if compress:
+        with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=6) as handle:
+            write_csv(df, handle, chunk_rows)
+    else:
+        write_csv(df, buffer, chunk_rows)
+    return buffer.getvalue()
+
+def _excel_rows(chunk):
+    # float32 readings would be widened to float64 as 25.469999313354492;
+    # going through their shortest repr keeps the digits the CSV export shows
+    float32_columns = chunk.select_dtypes('float32').columns
+    if len(float32_columns):
+        chunk = chunk.astype({column: str for column in float32_columns}).astype({column: 'float64' for column in float32_columns})
+    # openpyxl cannot store NaN/NaT, pandas leaves those cells empty
+    values = chunk.astype(object).where(chunk.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+def xlsx_bytes(df, chunk_rows=CHUNK_ROWS, sheet_rows=EXCEL_MAX_ROWS - 1):
+    # Write-only workbooks stream rows to the zip instead of keeping cell
+    # objects in memory. Tables over Excel's row limit continue on Sheet2, ...
+    workbook = Workbook(write_only=True)
+    header = [str(column) for column in df.columns]
+    sheet = None
+    sheet_count = 0
+    rows_in_sheet = sheet_rows
+    for chunk in iter_chunks(df, chunk_rows):
+        for row in _excel_rows(chunk):
+            if rows_in_sheet >= sheet_rows:
+                sheet_count += 1
+                sheet = workbook.create_sheet(f'Sheet{sheet_count}')
+                sheet.append(header)
+                rows_in_sheet = 0
+            sheet.append(row)
+            rows_in_sheet += 1
+    if sheet is None:
+        workbook.create_sheet('Sheet1').append(header)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+def parquet_bytes(df):
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False, compression='zstd')
+    return buffer.getvalue()
+
+def build_export(df, export_format):
+    if export_format == 'CSV':
+        return csv_bytes(df)
+    if export_format == 'CSV (gzip)':
+        return csv_bytes(df, compress=True)
+    if export_format == 'XLSX':
+        return xlsx_bytes(df)
+    if export_format == 'Parquet':
+        return parquet_bytes(df)
+    raise ValueError(f'Unsupported export format: {export_format}')
@@ -0,0 +1,92 @@
+import time
+import pandas as pd
+from pandas.api.types import union_categoricals
+from pandas.tseries.api import guess_datetime_format
+
+# Only the columns the viewer uses are read, with a compact schema:
+# categorical sensor names/units, float32 values and parsed datetimes.
+REQUIRED_COLUMNS = ['record_datetime', 'sensor_name', 'value_calibration', 'sensor_unit']
+CATEGORY_COLUMNS = ['sensor_name', 'sensor_unit']
+CSV_CHUNK_ROWS = 500_000
+SUPPORTED_TYPES = ['csv', 'xlsx', 'parquet', 'feather']
+
+def empty_frame():
+    return apply_schema(pd.DataFrame({column: [] for column in REQUIRED_COLUMNS}))
+
+def apply_schema(df):
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    return _coerce(df[REQUIRED_COLUMNS].copy())
+
+def _coerce(df, datetime_format=None):
+    # Shared by every format: unparsable datetimes/values become NaT/NaN and
+    # missing sensor names/units stay missing instead of turning into 'nan'
+    df['record_datetime'] = pd.to_datetime(df['record_datetime'], format=datetime_format, errors='coerce')
+    df['value_calibration'] = pd.to_numeric(df['value_calibration'], errors='coerce').astype('float32')
+    for column in CATEGORY_COLUMNS:
+        values = df[column]
+        values = values.astype(object).where(values.isna(), values.astype(str)).astype('category')
+        # An all-missing column has no string categories; casting them keeps
+        # the category dtype identical so chunks can be unioned
+        df[column] = values.cat.set_categories(values.cat.categories.astype(str))
+    return df
+
+def _datetime_format(values, sample=100):
+    # pandas infers the format from the first value of each call, so chunks
+    # would parse differently depending on where they split. The format is
+    # guessed once from the first chunk and reused for the rest.
+    for value in values.dropna().head(sample):
+        datetime_format = guess_datetime_format(str(value))
+        if datetime_format is not None:
+            return datetime_format
+    return None
+
+def _concat_chunks(chunks):
+    if not chunks:
+        return empty_frame()
+    # Categories differ between chunks, so they are unioned column by column
+    # instead of letting pd.concat fall back to object strings.
+    columns = {}
+    for column in REQUIRED_COLUMNS:
+        if column in CATEGORY_COLUMNS:
+            columns[column] = union_categoricals([chunk[column] for chunk in chunks], sort_categories=True)
+        else:
+            columns[column] = pd.concat([chunk[column] for chunk in chunks], ignore_index=True)
+    return pd.DataFrame(columns)
+
+def read_csv_chunked(source, chunk_rows=CSV_CHUNK_ROWS):
+    chunks = []
+    reader = pd.read_csv(
+        source,
+        usecols=REQUIRED_COLUMNS,
+        dtype={'sensor_name': str, 'sensor_unit': str},
+        chunksize=chunk_rows
+    )
+    datetime_format = None
+    for chunk in reader:
+        if not chunks:
+            datetime_format = _datetime_format(chunk['record_datetime'])
+        chunks.append(_coerce(chunk, datetime_format))
+    return _concat_chunks(chunks)
+
+def file_extension(file_name):
+    return file_name.rsplit('.', 1)[-1].lower() if '.' in file_name else ''
+
+def read_sensor_file(source, file_name, chunk_rows=CSV_CHUNK_ROWS):
+    extension = file_extension(file_name)
+    if extension == 'csv':
+        return read_csv_chunked(source, chunk_rows)
+    if extension == 'parquet':
+        return apply_schema(pd.read_parquet(source, columns=REQUIRED_COLUMNS))
+    if extension == 'feather':
+        return apply_schema(pd.read_feather(source, columns=REQUIRED_COLUMNS))
+    return apply_schema(pd.read_excel(source, usecols=REQUIRED_COLUMNS))
+
+def timed_read(source, file_name, chunk_rows=CSV_CHUNK_ROWS):
+    start = time.perf_counter()
+    df = read_sensor_file(source, file_name, chunk_rows)
+    return df, time.perf_counter() - start
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 2 ** 20
@@ -0,0 +1,193 @@
+import io
+import os
+import queue
+from collections import Counter
+
+import pandas as pd
+
+from analytics import DEFAULT_TOLERANCE_SECONDS, align_readings, compute_combined, compute_thi, compute_wci, split_sensors
+from ingest import SUPPORTED_TYPES, apply_schema, file_extension, read_sensor_file
+
+# Incremental processing of live sensor feeds. New readings are appended to
+# small per-type buffers; a temperature reading is only evaluated once every
+# humidity/wind reading within the tolerance can have arrived (watermark minus
+# tolerance), and the history is reduced to running counts plus a bounded tail.
+# The work per update therefore depends on the new rows, not on the history.
+DEFAULT_TAIL_ROWS = 20_000
+MAX_QUEUE_BATCHES = 1_000
+
+class LiveFeed:
+    def __init__(self, location_map=None, tolerance_seconds=DEFAULT_TOLERANCE_SECONDS, tail_rows=DEFAULT_TAIL_ROWS):
+        self.location_map = location_map
+        self.tolerance = pd.Timedelta(seconds=tolerance_seconds)
+        self.tail_rows = tail_rows
+        self.pending_temp = pd.DataFrame()
+        self.humidity = pd.DataFrame()
+        self.wind = pd.DataFrame()
+        self.watermark = None
+        self.rows_received = 0
+        self.counts = {'thi': Counter(), 'wci': Counter(), 'combined': Counter()}
+        self.tails = {'thi': pd.DataFrame(), 'wci': pd.DataFrame()}
+        # File offsets for tailing CSVs that gateways keep appending to
+        self.csv_offsets = {}
+        self.csv_headers = {}
+        self.seen_files = {}
+        # Rows already ingested from non-CSV files, which are re-read whole
+        self.file_rows = {}
+        # Files that failed on their last read, path -> error message
+        self.errors = {}
+
+    def append(self, df):
+        if df.empty:
+            return 0
+        df = apply_schema(df).dropna(subset=['record_datetime'])
+        # A batch without a parseable timestamp must not touch the watermark:
+        # a NaT watermark would never advance again
+        if df.empty:
+            return 0
+        self.rows_received += len(df)
+        temp_df, humidity_df, wind_df = split_sensors(df)
+        self.pending_temp = _concat(self.pending_temp, temp_df)
+        self.humidity = _concat(self.humidity, humidity_df)
+        self.wind = _concat(self.wind, wind_df)
+        latest = df['record_datetime'].max()
+        if self.watermark is None or latest > self.watermark:
+            self.watermark = latest
+        return self._evaluate()
+
+    def _evaluate(self):
+        if self.pending_temp.empty:
+            self._trim(self.watermark - self.tolerance)
+            return 0
+        cutoff = self.watermark - self.tolerance
+        ready_mask = self.pending_temp['record_datetime'] <= cutoff
+        ready = self.pending_temp[ready_mask]
+        self.pending_temp = self.pending_temp[~ready_mask]
+        if not ready.empty:
+            aligned = align_readings(ready, self.humidity, self.wind, self.location_map, self.tolerance.total_seconds())
+            merged_thi = compute_thi(aligned)
+            wind_merged = compute_wci(aligned)
+            combined = compute_combined(merged_thi, wind_merged)
+            self._count('thi', merged_thi, 'THI_Interpretasi')
+            self._count('wci', wind_merged, 'WCI_Interpretasi')
+            self._count('combined', combined, 'Interpretasi Gabungan')
+            self._extend_tail('thi', merged_thi)
+            self._extend_tail('wci', wind_merged)
+        oldest_needed = cutoff
+        if not self.pending_temp.empty:
+            oldest_needed = min(oldest_needed, self.pending_temp['record_datetime'].min())
+        self._trim(oldest_needed)
+        return len(ready)
+
+    def _count(self, name, frame, column):
+        if not frame.empty:
+            self.counts[name].update(frame[column].value_counts().loc[lambda counts: counts > 0].to_dict())
+
+    def _extend_tail(self, name, frame):
+        if not frame.empty:
+            self.tails[name] = _concat(self.tails[name], frame).tail(self.tail_rows)
+
+    def _trim(self, oldest_needed):
+        # Humidity/wind rows older than any temperature reading still to be
+        # aligned minus the tolerance can no longer be matched
+        keep_from = oldest_needed - self.tolerance
+        if not self.humidity.empty:
+            self.humidity = self.humidity[self.humidity['record_datetime'] >= keep_from]
+        if not self.wind.empty:
+            self.wind = self.wind[self.wind['record_datetime'] >= keep_from]
+
+    def poll_directory(self, directory):
+        # Picks up new files in the drop directory and rows appended to files
+        # that were already seen. Returns the number of rows appended. A file
+        # that cannot be read is recorded in self.errors and skipped until it
+        # changes again, so one bad export does not stop the feed.
+        appended = 0
+        if not os.path.isdir(directory):
+            return appended
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            extension = file_extension(name)
+            if not os.path.isfile(path) or extension not in SUPPORTED_TYPES or name.startswith('.'):
+                continue
+            try:
+                signature = (os.path.getmtime(path), os.path.getsize(path))
+            except OSError:
+                # Removed between listing and stat
+                continue
+            if self.seen_files.get(path) == signature:
+                continue
+            self.seen_files[path] = signature
+            try:
+                if extension == 'csv':
+                    new_rows = self._read_csv_tail(path)
+                else:
+                    new_rows = self._read_new_rows(path, name)
+                self.append(new_rows)
+            except Exception as e:
+                self.errors[path] = str(e)
+                continue
+            self.errors.pop(path, None)
+            appended += len(new_rows)
+        return appended
+
+    def _read_new_rows(self, path, name):
+        # Excel/Parquet/Feather exports cannot be tailed, so a changed file is
+        # read again and only the rows past those already ingested are kept.
+        # This assumes producers append; a file that shrank is treated as a
+        # replacement and ingested in full.
+        frame = read_sensor_file(path, name)
+        ingested = self.file_rows.get(path, 0)
+        if len(frame) < ingested:
+            ingested = 0
+        self.file_rows[path] = len(frame)
+        return frame.iloc[ingested:]
+
+    def _read_csv_tail(self, path):
+        offset = self.csv_offsets.get(path, 0)
+        header = self.csv_headers.get(path)
+        size = os.path.getsize(path)
+        if size < offset:
+            # The file was truncated or replaced, start over
+            offset = 0
+            header = None
+        if size == offset:
+            return pd.DataFrame()
+        with open(path, 'rb') as handle:
+            handle.seek(offset)
+            data = handle.read(size - offset)
+        # Only complete lines are consumed; a partially written line is read
+        # again on the next poll
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return pd.DataFrame()
+        if header is None:
+            frame = pd.read_csv(io.BytesIO(data[:end]))
+            self.csv_headers[path] = list(frame.columns)
+        else:
+            frame = pd.read_csv(io.BytesIO(data[:end]), header=None, names=header)
+        # The offset only moves once the chunk parsed
+        self.csv_offsets[path] = offset + end
+        return frame
+
+    def drain_queue(self, source, max_batches=MAX_QUEUE_BATCHES):
+        # API for a socket/message bus: producers put DataFrames of new
+        # readings on a queue.Queue and the consumer drains it. The dashboard
+        # itself only polls the drop directory.
+        batches = []
+        while len(batches) < max_batches:
+            try:
+                batches.append(source.get_nowait())
+            except queue.Empty:
+                break
+        if not batches:
+            return 0
+        frame = pd.concat(batches, ignore_index=True)
+        self.append(frame)
+        return len(frame)
+
+def _concat(left, right):
+    if left.empty:
+        return right
+    if right.empty:
+        return left
+    return pd.concat([left, right], ignore_index=True)
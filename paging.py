@@ -0,0 +1,81 @@
+import re
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from classification import resolve_unique
+
+# Server-side filtering, sorting and paging for large tables. The filtered and
+# sorted row positions are computed once per table and settings; a page is then
+# just a slice of those positions, so turning pages does not depend on the
+# table size. Only the visible page is sent to the browser.
+PAGE_SIZES = [50, 100, 250, 500]
+NUMERIC_FILTER = re.compile(r'^\s*(>=|<=|>|<|=)?\s*(-?\d+(?:\.\d+)?)\s*$')
+
+def _text_mask(values, text):
+    # Matched once per distinct value (categories) instead of once per row
+    text = text.lower()
+    return resolve_unique(values, lambda value: text in str(value).lower()).astype(bool)
+
+def _numeric_mask(values, text):
+    match = NUMERIC_FILTER.match(text)
+    if match is None:
+        return _text_mask(values, text)
+    operator, number = match.group(1) or '=', float(match.group(2))
+    values = values.to_numpy(dtype='float64', na_value=np.nan)
+    if operator == '>':
+        return values > number
+    if operator == '<':
+        return values < number
+    if operator == '>=':
+        return values >= number
+    if operator == '<=':
+        return values <= number
+    return values == number
+
+def filter_positions(df, sensors=None, start=None, end=None, filter_column=None, filter_text='', sensor_column='sensor_name', time_column='record_datetime'):
+    mask = np.ones(len(df), dtype=bool)
+    if sensors and sensor_column in df.columns:
+        mask &= df[sensor_column].isin(sensors).to_numpy()
+    if start is not None and time_column in df.columns:
+        mask &= (df[time_column] >= start).to_numpy()
+    if end is not None and time_column in df.columns:
+        mask &= (df[time_column] <= end).to_numpy()
+    if filter_column and filter_text.strip():
+        column = df[filter_column]
+        if is_numeric_dtype(column) and not isinstance(column.dtype, pd.CategoricalDtype):
+            mask &= _numeric_mask(column, filter_text)
+        else:
+            mask &= _text_mask(column, filter_text)
+    return np.flatnonzero(mask)
+
+def sort_positions(df, positions, sort_column=None, ascending=True):
+    if not sort_column:
+        return positions
+    values = df[sort_column].iloc[positions].reset_index(drop=True)
+    order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+    return positions[order]
+
+def page_count(n_rows, page_size):
+    return max(1, -(-n_rows // page_size))
+
+def page_frame(df, positions, page, page_size, columns=None):
+    start = (page - 1) * page_size
+    page_rows = df.iloc[positions[start:start + page_size]]
+    if columns is not None:
+        page_rows = page_rows[columns]
+    return compact_text(page_rows)
+
+def compact_text(page_rows):
+    # Repeated strings (advice texts, sensor names) are sent as categories so
+    # Arrow ships each distinct value once with small integer codes
+    page_rows = page_rows.copy()
+    for column in page_rows.columns:
+        values = page_rows[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            page_rows[column] = values.cat.remove_unused_categories()
+        elif pd.api.types.is_string_dtype(values) and values.nunique(dropna=True) * 2 <= len(values):
+            # object columns as well as pandas' dedicated str dtype
+            page_rows[column] = values.astype('category')
+    return page_rows
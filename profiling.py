@@ -0,0 +1,76 @@
+import json
+import logging
+import os
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+# Lightweight per-stage instrumentation: wall time, rows in/out and the change
+# in resident memory. Every finished stage is logged as one JSON line on the
+# "iotdata.profiling" logger (printed to stderr when IOTDATA_PROFILE_LOG is set)
+# and, when IOTDATA_METRICS_FILE is set, appended to that file so slow sessions
+# can be analysed afterwards.
+METRICS_FILE = os.environ.get('IOTDATA_METRICS_FILE')
+logger = logging.getLogger('iotdata.profiling')
+if os.environ.get('IOTDATA_PROFILE_LOG') and not logger.handlers:
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm', encoding='ascii') as handle:
+            resident_pages = int(handle.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / 2 ** 20
+
+def new_session_id():
+    return uuid.uuid4().hex[:12]
+
+class StageProfiler:
+    def __init__(self, session_id=None, metrics_file=METRICS_FILE):
+        self.session_id = session_id or new_session_id()
+        self.metrics_file = metrics_file
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        # The caller may set record['rows_out'] inside the block
+        record = {'stage': name, 'rows_in': rows_in, 'rows_out': None}
+        memory_before = rss_mb()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = round(time.perf_counter() - start, 4)
+            memory_after = rss_mb()
+            if memory_before is not None and memory_after is not None:
+                record['memory_delta_mb'] = round(memory_after - memory_before, 2)
+            else:
+                record['memory_delta_mb'] = None
+            self.records.append(record)
+            logger.info(json.dumps({'session': self.session_id, **record}))
+
+    def frame(self):
+        return pd.DataFrame(self.records, columns=['stage', 'seconds', 'rows_in', 'rows_out', 'memory_delta_mb'])
+
+    def flush(self):
+        if not self.metrics_file or not self.records:
+            return
+        timestamp = time.time()
+        with open(self.metrics_file, 'a', encoding='utf-8') as handle:
+            for record in self.records:
+                handle.write(json.dumps({'time': timestamp, 'session': self.session_id, **record}) + '\n')
+
+def stage(profiler, name, rows_in=None):
+    # Lets library code instrument itself without requiring a profiler
+    if profiler is None:
+        return nullcontext({})
+    return profiler.stage(name, rows_in)
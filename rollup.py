@@ -0,0 +1,115 @@
+import pandas as pd
+
+from classification import THI_LABELS, WCI_LABELS
+
+# Multi-resolution aggregates of THI/WCI per location. The minute level is built
+# from the raw readings once; hour and day are rolled up from the level below.
+# Only additive statistics are stored (sum, count, min, max, per-category
+# minutes), so every level can be rolled up further without the raw data.
+LEVELS = [
+    ('minute', 'min', pd.Timedelta(minutes=1)),
+    ('hour', 'h', pd.Timedelta(hours=1)),
+    ('day', 'D', pd.Timedelta(days=1))
+]
+KINDS = {
+    'thi': ('THI', 'THI_Interpretasi', THI_LABELS),
+    'wci': ('WCI', 'WCI_Interpretasi', WCI_LABELS)
+}
+DEFAULT_MAX_BUCKETS = 500
+
+def _aggregations(labels):
+    aggregations = {'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'}
+    aggregations.update({f'minutes_{i}': 'sum' for i in range(len(labels))})
+    return aggregations
+
+def _minute_level(frame, kind):
+    value_column, label_column, labels = KINDS[kind]
+    values = frame[value_column].astype('float64')
+    codes = pd.Categorical(frame[label_column], categories=labels).codes
+    data = pd.DataFrame({
+        'location': frame['location'].astype(str).to_numpy(),
+        'bucket': frame['record_datetime'].dt.floor('min').to_numpy(),
+        'sum': values.to_numpy(),
+        'count': values.notna().astype('int64').to_numpy(),
+        'min': values.to_numpy(),
+        'max': values.to_numpy()
+    })
+    for i in range(len(labels)):
+        data[f'minutes_{i}'] = (codes == i).astype('int64')
+    minute = data.groupby(['location', 'bucket'], sort=True).agg(_aggregations(labels))
+    # Readings per category become the share of the minute spent in it
+    readings = minute[[f'minutes_{i}' for i in range(len(labels))]].sum(axis=1)
+    for i in range(len(labels)):
+        minute[f'minutes_{i}'] = minute[f'minutes_{i}'] / readings
+    return minute.reset_index()
+
+def _roll_up(finer, freq, kind):
+    labels = KINDS[kind][2]
+    coarser = finer.assign(bucket=finer['bucket'].dt.floor(freq))
+    return coarser.groupby(['location', 'bucket'], sort=True).agg(_aggregations(labels)).reset_index()
+
+def build_rollups(merged_thi, wind_merged):
+    rollups = {}
+    for kind, frame in (('thi', merged_thi), ('wci', wind_merged)):
+        if frame.empty:
+            continue
+        level_frame = _minute_level(frame, kind)
+        for level, freq, _ in LEVELS:
+            if level != 'minute':
+                level_frame = _roll_up(level_frame, freq, kind)
+            rollups[f'{kind}_{level}'] = level_frame
+    return rollups
+
+def choose_level(start, end, max_buckets=DEFAULT_MAX_BUCKETS):
+    # The finest level that still answers the range in at most max_buckets
+    # buckets per location; long ranges fall through to coarser levels
+    span = end - start
+    for level, _, width in LEVELS:
+        if span / width <= max_buckets:
+            return level
+    return LEVELS[-1][0]
+
+def query_rollup(rollups, kind, start=None, end=None, max_buckets=DEFAULT_MAX_BUCKETS, locations=None):
+    finest = rollups.get(f'{kind}_minute')
+    if finest is None or finest.empty:
+        return None, pd.DataFrame()
+    start = finest['bucket'].min() if start is None else pd.Timestamp(start)
+    end = finest['bucket'].max() if end is None else pd.Timestamp(end)
+    level = choose_level(start, end, max_buckets)
+    frame = rollups[f'{kind}_{level}']
+    freq = next(freq for name, freq, _ in LEVELS if name == level)
+    frame = frame[(frame['bucket'] >= start.floor(freq)) & (frame['bucket'] <= end)]
+    if locations:
+        frame = frame[frame['location'].isin(locations)]
+    return level, finalize(frame, kind)
+
+def finalize(frame, kind):
+    value_column, _, labels = KINDS[kind]
+    result = pd.DataFrame({
+        'location': frame['location'],
+        'bucket': frame['bucket'],
+        f'{value_column} mean': frame['sum'] / frame['count'],
+        f'{value_column} min': frame['min'],
+        f'{value_column} max': frame['max'],
+        'readings': frame['count']
+    })
+    for i, label in enumerate(labels):
+        result[f'Menit {label}'] = frame[f'minutes_{i}']
+    return result.reset_index(drop=True)
+
+def summarize_rollup(frame, kind):
+    # Whole-range statistics per location from the (already aggregated) buckets
+    value_column, _, labels = KINDS[kind]
+    if frame.empty:
+        return pd.DataFrame()
+    weighted = frame.assign(weighted_sum=frame[f'{value_column} mean'] * frame['readings'])
+    aggregations = {
+        'weighted_sum': 'sum',
+        'readings': 'sum',
+        f'{value_column} min': 'min',
+        f'{value_column} max': 'max'
+    }
+    aggregations.update({f'Menit {label}': 'sum' for label in labels})
+    summary = weighted.groupby('location').agg(aggregations)
+    summary.insert(0, f'{value_column} mean', summary.pop('weighted_sum') / summary['readings'])
+    return summary
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from analytics import align_readings, sensor_location
+
+START = pd.Timestamp('2024-01-01')
+
+def readings(sensor_name, seconds, values, unit):
+    return pd.DataFrame({
+        'record_datetime': START + pd.to_timedelta(seconds, unit='s'),
+        'sensor_name': sensor_name,
+        'value_calibration': np.asarray(values, dtype='float64'),
+        'sensor_unit': unit
+    })
+
+def test_sensor_location_strips_sensor_type():
+    assert sensor_location('temp_sensor1') == 'sensor1'
+    assert sensor_location('Humidity-Sensor1') == 'sensor1'
+    assert sensor_location('wind_speed kandang A') == 'kandang_a'
+    assert sensor_location('temp') == 'default'
+
+def test_align_pairs_readings_by_location():
+    temp = pd.concat([
+        readings('temp_sensor1', [0, 60], [25.0, 26.0], 'C'),
+        readings('temp_sensor2', [0, 60], [30.0, 31.0], 'C')
+    ], ignore_index=True)
+    humidity = pd.concat([
+        readings('hum_sensor1', [1, 61], [70.0, 71.0], '%'),
+        readings('hum_sensor2', [2, 62], [80.0, 81.0], '%')
+    ], ignore_index=True)
+    wind = readings('wind_sensor2', [0, 60], [3.0, 4.0], 'm/s')
+    aligned = align_readings(temp, humidity, wind).sort_values(['sensor_name', 'record_datetime'])
+    assert list(aligned['sensor_name_hum']) == ['hum_sensor1', 'hum_sensor1', 'hum_sensor2', 'hum_sensor2']
+    assert list(aligned['value_calibration_hum']) == [70.0, 71.0, 80.0, 81.0]
+    # sensor1 has no wind sensor, so it must not borrow sensor2's readings
+    assert aligned.loc[aligned['location'] == 'sensor1', 'value_calibration_wind'].isna().all()
+    assert list(aligned.loc[aligned['location'] == 'sensor2', 'value_calibration_wind']) == [3.0, 4.0]
+
+def test_align_uses_location_map():
+    temp = readings('T-01', [0], [25.0], 'C')
+    humidity = readings('H-07', [5], [60.0], '%')
+    aligned = align_readings(temp, humidity, pd.DataFrame(), location_map={'T-01': 'kandang_a', 'H-07': 'kandang_a'})
+    assert list(aligned['location']) == ['kandang_a']
+    assert list(aligned['value_calibration_hum']) == [60.0]
+
+def test_align_respects_tolerance():
+    temp = readings('temp_sensor1', [0, 600], [25.0, 26.0], 'C')
+    humidity = readings('hum_sensor1', [30, 720], [70.0, 71.0], '%')
+    aligned = align_readings(temp, humidity, pd.DataFrame(), tolerance_seconds=60)
+    # 30 s away is within the tolerance, 120 s away is not
+    assert aligned['value_calibration_hum'].iloc[0] == 70.0
+    assert np.isnan(aligned['value_calibration_hum'].iloc[1])
+    wider = align_readings(temp, humidity, pd.DataFrame(), tolerance_seconds=120)
+    assert list(wider['value_calibration_hum']) == [70.0, 71.0]
+
+def test_align_picks_nearest_reading():
+    temp = readings('temp_sensor1', [100], [25.0], 'C')
+    humidity = readings('hum_sensor1', [50, 90, 130], [60.0, 61.0, 62.0], '%')
+    aligned = align_readings(temp, humidity, pd.DataFrame())
+    assert list(aligned['value_calibration_hum']) == [61.0]
+
+def test_align_keeps_one_row_per_temperature_reading():
+    # The old merge on record_datetime alone produced one row per sensor
+    # pair at equal timestamps; alignment must not multiply rows
+    seconds = np.arange(0, 3600, 60)
+    sensors = [f'sensor{index}' for index in range(20)]
+    temp = pd.concat([readings(f'temp_{name}', seconds, 25.0, 'C') for name in sensors], ignore_index=True)
+    humidity = pd.concat([readings(f'hum_{name}', seconds, 70.0, '%') for name in sensors], ignore_index=True)
+    wind = pd.concat([readings(f'wind_{name}', seconds, 2.0, 'm/s') for name in sensors], ignore_index=True)
+    aligned = align_readings(temp, humidity, wind)
+    assert len(aligned) == len(temp)
+    assert aligned['value_calibration_hum'].notna().all()
+    assert (aligned['sensor_name'].str[len('temp_'):] == aligned['sensor_name_hum'].str[len('hum_'):]).all()
@@ -0,0 +1,21 @@
+import csv
+
+from batch import main
+from benchmarks.synthetic import generate_readings
+
+def test_batch_summary_keeps_integer_counts_when_a_file_fails(tmp_path):
+    inputs = tmp_path / 'inputs'
+    inputs.mkdir()
+    generate_readings(3_000).to_csv(inputs / 'house1.csv', index=False)
+    (inputs / 'broken.csv').write_text('foo,bar\n1,2\n')
+    output_dir = tmp_path / 'output'
+    assert main([str(inputs), '-o', str(output_dir), '-j', '1']) == 1
+    with open(output_dir / 'batch_summary.csv', newline='') as handle:
+        rows = {row['output'] or row['file']: row for row in csv.DictReader(handle)}
+    good = rows['house1.csv']
+    count_columns = [column for column in good if column.startswith('rows_') or '_counts:' in column]
+    assert good['rows_input'] == '3000'
+    assert count_columns and all(good[column].isdigit() for column in count_columns)
+    failed = rows[str(inputs / 'broken.csv')]
+    assert failed['error']
+    assert all(failed[column] == '' for column in count_columns)
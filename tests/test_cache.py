@@ -0,0 +1,47 @@
+import os
+
+import pandas as pd
+
+import cache
+from cache import _entries, cache_key, cache_stats, evict, load_frames, store_frames
+
+def frames(rows):
+    return {'thi': pd.DataFrame({'THI': [float(row) for row in range(rows)]}), 'wci': pd.DataFrame()}
+
+def test_store_and_load_round_trip(tmp_path):
+    key = cache_key('abc', 'analysis', tolerance_seconds=60)
+    assert load_frames(key, tmp_path) is None
+    store_frames(key, frames(10), tmp_path)
+    loaded = load_frames(key, tmp_path)
+    pd.testing.assert_frame_equal(loaded['thi'], frames(10)['thi'])
+    assert loaded['wci'].empty
+    stats = cache_stats(tmp_path)
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+def test_misses_are_recorded_before_the_directory_exists(tmp_path):
+    cache_dir = tmp_path / 'not-yet'
+    assert load_frames(cache_key('abc', 'parsed'), cache_dir) is None
+    assert cache_stats(cache_dir)['misses'] == 1
+
+def test_key_depends_on_params_and_version(monkeypatch):
+    key = cache_key('abc', 'analysis', tolerance_seconds=60)
+    assert key == cache_key('abc', 'analysis', tolerance_seconds=60)
+    assert key != cache_key('abc', 'analysis', tolerance_seconds=30)
+    assert key != cache_key('abc', 'parsed', tolerance_seconds=60)
+    monkeypatch.setattr(cache, 'CACHE_VERSION', cache.CACHE_VERSION + 1)
+    assert key != cache_key('abc', 'analysis', tolerance_seconds=60)
+
+def test_evicts_least_recently_used(tmp_path):
+    keys = [cache_key(name, 'parsed') for name in ('a', 'b', 'c')]
+    for age, key in enumerate(keys):
+        store_frames(key, frames(1_000), tmp_path)
+        os.utime(tmp_path / key, (1_000 + age, 1_000 + age))
+    # Loading the oldest entry makes it the most recently used
+    assert load_frames(keys[0], tmp_path) is not None
+    sizes = {os.path.basename(path): size for _, size, path in _entries(tmp_path)}
+    limit = (sizes[keys[0]] + sizes[keys[2]]) / 2 ** 20
+    assert evict(limit, tmp_path) == 1
+    assert load_frames(keys[1], tmp_path) is None
+    assert load_frames(keys[0], tmp_path) is not None
+    assert load_frames(keys[2], tmp_path) is not None
+    assert cache_stats(tmp_path)['evictions'] == 1
@@ -0,0 +1,95 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from classification import (
+    COMBINED_LABELS, THI_LABELS, WCI_LABELS, combined_advice, interpret_combined, interpret_thi, interpret_wci
+)
+
+# The per-row if/elif functions the vectorized versions replaced, kept
+# verbatim as the reference. NaN fails every comparison and lands in the
+# else branch.
+def reference_thi(thi):
+    if thi < 27:
+        return 'Aman (Normal)'
+    elif 27 <= thi < 28:
+        return 'Waspada (Stress Ringan)'
+    elif 28 <= thi < 30:
+        return 'Stress Sedang'
+    else:
+        return 'Stress Berat'
+
+def reference_wci(wci):
+    if wci < 24:
+        return 'Risiko Kedinginan (Wind Chill Tinggi)'
+    elif 24 <= wci < 27:
+        return 'Cukup Dingin (Perlu Waspada)'
+    else:
+        return 'Aman (Normal)'
+
+def reference_combined(thi_label, wci_label):
+    if thi_label in ['Stress Berat', 'Stress Sedang'] or wci_label == 'Risiko Kedinginan (Wind Chill Tinggi)':
+        return 'Risiko Tinggi: Segera lakukan perbaikan lingkungan!'
+    elif thi_label == 'Waspada (Stress Ringan)' or wci_label == 'Cukup Dingin (Perlu Waspada)':
+        return 'Waspada: Monitor dan lakukan pencegahan.'
+    else:
+        return 'Aman'
+
+def reference_advice(label):
+    if label == 'Risiko Tinggi: Segera lakukan perbaikan lingkungan!':
+        return 'Perbaiki ventilasi, tambahkan pendingin/pemanas, kurangi kepadatan, dan lindungi dari angin.'
+    elif label == 'Waspada: Monitor dan lakukan pencegahan.':
+        return 'Pantau suhu, kelembaban, dan angin secara berkala, lakukan tindakan preventif.'
+    else:
+        return 'Pertahankan kondisi kandang saat ini.'
+
+# Every threshold, values just either side of it, extremes and NaN
+EDGE_VALUES = [
+    -math.inf, -40.0, 0.0, 23.999, 24.0, 24.001, 26.999, 27.0, 27.001, 27.999,
+    28.0, 28.001, 29.999, 30.0, 30.001, 45.0, math.inf, math.nan
+]
+
+def sample_values():
+    rng = np.random.default_rng(0)
+    return np.concatenate([EDGE_VALUES, rng.uniform(15, 40, 5_000)])
+
+@pytest.mark.parametrize('dtype', ['float64', 'float32'])
+def test_interpret_thi_matches_reference(dtype):
+    values = sample_values().astype(dtype)
+    assert list(interpret_thi(pd.Series(values))) == [reference_thi(value) for value in values]
+
+@pytest.mark.parametrize('dtype', ['float64', 'float32'])
+def test_interpret_wci_matches_reference(dtype):
+    values = sample_values().astype(dtype)
+    assert list(interpret_wci(pd.Series(values))) == [reference_wci(value) for value in values]
+
+def test_interpret_thi_keeps_label_order():
+    assert list(interpret_thi(pd.Series([20.0])).categories) == THI_LABELS
+    assert list(interpret_wci(pd.Series([20.0])).categories) == WCI_LABELS
+
+def test_interpret_combined_matches_reference_for_every_pair():
+    pairs = [(thi, wci) for thi in THI_LABELS for wci in WCI_LABELS]
+    thi_labels = pd.Series([thi for thi, _ in pairs])
+    wci_labels = pd.Series([wci for _, wci in pairs])
+    result = interpret_combined(thi_labels, wci_labels)
+    assert list(result) == [reference_combined(thi, wci) for thi, wci in pairs]
+    assert list(result.categories) == COMBINED_LABELS
+
+def test_interpret_combined_accepts_categoricals():
+    values = sample_values()
+    thi_labels = interpret_thi(pd.Series(values))
+    wci_labels = interpret_wci(pd.Series(values[::-1]))
+    expected = [reference_combined(thi, wci) for thi, wci in zip(thi_labels, wci_labels)]
+    assert list(interpret_combined(thi_labels, wci_labels)) == expected
+
+def test_unknown_and_missing_labels():
+    thi_labels = pd.Series(['unknown', None, None, 'Stress Berat'])
+    wci_labels = pd.Series([None, None, 'Cukup Dingin (Perlu Waspada)', None])
+    assert list(interpret_combined(thi_labels, wci_labels)) == [COMBINED_LABELS[0], COMBINED_LABELS[0], COMBINED_LABELS[1], COMBINED_LABELS[2]]
+    assert list(combined_advice(pd.Series([None, np.nan]))) == [reference_advice('Aman')] * 2
+
+def test_combined_advice_matches_reference():
+    labels = COMBINED_LABELS + ['unknown']
+    assert list(combined_advice(pd.Series(labels))) == [reference_advice(label) for label in labels]
@@ -0,0 +1,66 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingest import apply_schema, read_csv_chunked, read_sensor_file
+
+HEADER = 'record_datetime,sensor_name,value_calibration,sensor_unit\n'
+
+def read(csv, chunk_rows):
+    return read_csv_chunked(io.StringIO(HEADER + csv), chunk_rows=chunk_rows)
+
+@pytest.mark.parametrize('chunk_rows', [1, 2, 10])
+def test_chunks_with_blank_categories_concatenate(chunk_rows):
+    df = read(
+        '2024-01-01 00:00:00,temp_a,25.0,C\n'
+        '2024-01-01 00:01:00,,26.0,\n'
+        '2024-01-01 00:02:00,temp_b,27.0,C\n',
+        chunk_rows
+    )
+    assert isinstance(df['sensor_unit'].dtype, pd.CategoricalDtype)
+    assert df['sensor_unit'].isna().tolist() == [False, True, False]
+    # Missing names stay missing instead of becoming the string 'nan'
+    assert df['sensor_name'].isna().tolist() == [False, True, False]
+    assert list(df['sensor_name'].cat.categories) == ['temp_a', 'temp_b']
+
+def test_datetime_format_does_not_depend_on_chunking():
+    # The format comes from the first rows; a row in another format is NaT
+    # whichever chunk it lands in
+    csv = (
+        '2024-01-02 00:00:00,temp_a,25.0,C\n'
+        'garbage,temp_a,26.0,C\n'
+        '01/02/2024 00:01,temp_a,27.0,C\n'
+        '2024-01-13 00:02:00,temp_a,28.0,C\n'
+    )
+    expected = pd.to_datetime(['2024-01-02 00:00', None, None, '2024-01-13 00:02']).tolist()
+    for chunk_rows in (1, 2, 10):
+        assert read(csv, chunk_rows)['record_datetime'].tolist() == expected
+
+def test_values_are_coerced():
+    df = read('2024-01-01 00:00:00,temp_a,abc,C\n2024-01-01 00:01:00,temp_a,1.5,C\n', 1)
+    assert df['value_calibration'].dtype == np.float32
+    assert np.isnan(df['value_calibration'].iloc[0])
+    assert df['value_calibration'].iloc[1] == 1.5
+
+def test_csv_matches_other_formats(tmp_path):
+    frame = pd.DataFrame({
+        'record_datetime': ['2024-01-01 00:00:00', '2024-01-01 00:01:00'],
+        'sensor_name': ['temp_a', None],
+        'value_calibration': [25.0, 26.0],
+        'sensor_unit': ['C', None],
+        'extra': [1, 2]
+    })
+    csv_path = tmp_path / 'data.csv'
+    parquet_path = tmp_path / 'data.parquet'
+    frame.to_csv(csv_path, index=False)
+    frame.to_parquet(parquet_path)
+    from_csv = read_sensor_file(csv_path, 'data.csv')
+    from_parquet = read_sensor_file(parquet_path, 'data.parquet')
+    assert list(from_csv.columns) == list(from_parquet.columns)
+    pd.testing.assert_frame_equal(from_csv, from_parquet, check_dtype=False, check_categorical=False)
+
+def test_missing_columns_are_reported():
+    with pytest.raises(ValueError, match='sensor_unit'):
+        apply_schema(pd.DataFrame({'record_datetime': [], 'sensor_name': [], 'value_calibration': []}))
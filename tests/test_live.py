@@ -0,0 +1,107 @@
+import os
+import queue
+
+import pandas as pd
+
+from live import LiveFeed
+
+START = pd.Timestamp('2024-01-01')
+
+def batch(*rows):
+    # rows: (seconds after START, sensor_name, value)
+    return pd.DataFrame({
+        'record_datetime': [(START + pd.Timedelta(seconds=seconds)).isoformat() for seconds, _, _ in rows],
+        'sensor_name': [name for _, name, _ in rows],
+        'value_calibration': [value for _, _, value in rows],
+        'sensor_unit': ['u'] * len(rows)
+    })
+
+def test_waits_for_tolerance_before_evaluating():
+    feed = LiveFeed(tolerance_seconds=60)
+    assert feed.append(batch((0, 'temp_sensor1', 30.0), (0, 'hum_sensor1', 80.0))) == 0
+    assert len(feed.pending_temp) == 1
+    # A humidity reading 30 s later could still be the nearer match
+    assert feed.append(batch((30, 'hum_sensor1', 81.0))) == 0
+    assert feed.append(batch((120, 'hum_sensor1', 82.0))) == 1
+    assert feed.pending_temp.empty
+    assert sum(feed.counts['thi'].values()) == 1
+    assert feed.watermark == START + pd.Timedelta(seconds=120)
+
+def test_unparsable_batch_leaves_feed_working():
+    feed = LiveFeed(tolerance_seconds=60)
+    garbage = batch((0, 'temp_sensor1', 30.0))
+    garbage['record_datetime'] = 'not a date'
+    assert feed.append(garbage) == 0
+    assert feed.watermark is None
+    assert feed.rows_received == 0
+    feed.append(batch((0, 'temp_sensor1', 30.0), (0, 'hum_sensor1', 80.0)))
+    assert feed.append(batch((120, 'hum_sensor1', 82.0))) == 1
+    assert sum(feed.counts['thi'].values()) == 1
+    assert feed.pending_temp.empty
+
+def test_csv_tail_waits_for_complete_lines(tmp_path):
+    path = tmp_path / 'feed.csv'
+    path.write_text(
+        'record_datetime,sensor_name,value_calibration,sensor_unit\n'
+        '2024-01-01 00:00:00,temp_sensor1,30.0,C\n'
+        '2024-01-01 00:01:00,hum_sen'
+    )
+    feed = LiveFeed()
+    assert feed.poll_directory(tmp_path) == 1
+    # Nothing changed, nothing is read again
+    assert feed.poll_directory(tmp_path) == 0
+    with open(path, 'a') as handle:
+        handle.write('sor1,80.0,%\n2024-01-01 00:02:00,temp_sensor1,31.0,C\n')
+    assert feed.poll_directory(tmp_path) == 2
+    assert feed.rows_received == 3
+    assert feed.humidity['sensor_name'].astype(str).tolist() == ['hum_sensor1']
+
+def test_truncated_csv_is_read_from_the_start(tmp_path):
+    path = tmp_path / 'feed.csv'
+    header = 'record_datetime,sensor_name,value_calibration,sensor_unit\n'
+    path.write_text(header + '2024-01-01 00:00:00,temp_sensor1,30.0,C\n2024-01-01 00:01:00,temp_sensor1,31.0,C\n')
+    feed = LiveFeed()
+    assert feed.poll_directory(tmp_path) == 2
+    path.write_text(header + '2024-01-01 00:05:00,temp_sensor1,32.0,C\n')
+    assert feed.poll_directory(tmp_path) == 1
+
+def write_parquet(path, frame, mtime):
+    frame.to_parquet(path)
+    os.utime(path, (mtime, mtime))
+
+def test_rewritten_files_only_add_new_rows(tmp_path):
+    path = tmp_path / 'export.parquet'
+    rows = [(seconds, 'temp_sensor1', 30.0) for seconds in range(0, 300, 60)]
+    feed = LiveFeed()
+    write_parquet(path, batch(*rows[:3]), 1_000)
+    assert feed.poll_directory(tmp_path) == 3
+    write_parquet(path, batch(*rows), 2_000)
+    assert feed.poll_directory(tmp_path) == 2
+    assert feed.rows_received == 5
+    # A shorter file replaced the old one and is ingested in full
+    write_parquet(path, batch(*rows[:1]), 3_000)
+    assert feed.poll_directory(tmp_path) == 1
+    assert feed.rows_received == 6
+
+def test_unreadable_file_is_reported_and_skipped(tmp_path):
+    (tmp_path / 'bad.csv').write_text('foo,bar\n1,2\n')
+    (tmp_path / 'good.csv').write_text(
+        'record_datetime,sensor_name,value_calibration,sensor_unit\n'
+        '2024-01-01 00:00:00,temp_sensor1,30.0,C\n'
+    )
+    feed = LiveFeed()
+    assert feed.poll_directory(tmp_path) == 1
+    assert list(feed.errors) == [os.path.join(tmp_path, 'bad.csv')]
+    assert 'Missing required columns' in feed.errors[os.path.join(tmp_path, 'bad.csv')]
+    # Skipped until it changes
+    assert feed.poll_directory(tmp_path) == 0
+
+def test_drain_queue_takes_at_most_max_batches():
+    source = queue.Queue()
+    for seconds in range(0, 300, 60):
+        source.put(batch((seconds, 'temp_sensor1', 30.0)))
+    feed = LiveFeed()
+    assert feed.drain_queue(source, max_batches=3) == 3
+    assert feed.drain_queue(source) == 2
+    assert feed.drain_queue(source) == 0
+    assert feed.rows_received == 5
@@ -0,0 +1,20 @@
+import pandas as pd
+
+from paging import compact_text
+
+def test_repeated_text_is_sent_as_categories():
+    page = pd.DataFrame({
+        'location': pd.Series(['house1', 'house1', 'house2', 'house1'], dtype='str'),
+        'advice': pd.Series(['keep', 'keep', 'keep', 'keep'], dtype=object),
+        'sensor_name': pd.Series(['a', 'b', 'c', 'd'], dtype='str'),
+        'sensor_unit': pd.Categorical(['C', 'C', 'C', 'C'], categories=['%', 'C']),
+        'value': [1.0, 2.0, 3.0, 4.0]
+    })
+    compact = compact_text(page)
+    assert isinstance(compact['location'].dtype, pd.CategoricalDtype)
+    assert isinstance(compact['advice'].dtype, pd.CategoricalDtype)
+    # Mostly distinct strings gain nothing from categories
+    assert not isinstance(compact['sensor_name'].dtype, pd.CategoricalDtype)
+    assert list(compact['sensor_unit'].cat.categories) == ['C']
+    assert compact['value'].dtype == 'float64'
+    pd.testing.assert_frame_equal(compact.astype(object), page.astype(object))